@@ -1,15 +1,23 @@
 import json
+import numpy as np
 from abc import ABCMeta, abstractmethod
 from typing import Optional, Union, Tuple, List, Dict, Union
-from core.infrastructure import Infrastructure, Link, DataFlow, Node, Location
+from core.infrastructure import Infrastructure, InfrastructureState, Link, DataFlow, Node, Location
+from core.scenario_artifact import artifact_path, load_artifact, save_artifact
 
 __all__ = ["BaseScenario"]
 
 class BaseScenario(metaclass=ABCMeta):
     """Base class for customized scenarios."""
 
-    def __init__(self, config_file: str):
-        """Initialize the scenario by loading the configuration file and setting up the infrastructure."""
+    def __init__(self, config_file: str, use_artifact: bool = True):
+        """
+        Initialize the scenario by loading the configuration file and setting up the infrastructure.
+
+        If use_artifact is set and the scenario is built by the default methods, the infrastructure 
+        is loaded from the compiled artifact next to the configuration file when it is up to date, 
+        and the artifact is (re)written otherwise (see :mod:`core.scenario_artifact`).
+        """
         self.json_object = self.load_config(config_file)
         self.json_nodes, self.json_edges = self.json_object['Nodes'], self.json_object['Edges']
         
@@ -24,10 +32,136 @@ class BaseScenario(metaclass=ABCMeta):
         self.signal_speed = 2.0e5 - 1.5e5 # Signal speed in fiber (km/s) - Hop delay + Router delay
         self.base_energy_coef = 0.8/10000 # Energy coefficient for the link (J/mb/km)
 
+        use_artifact = use_artifact and self._default_build()
+        artifact = load_artifact(artifact_path(config_file), config_file) if use_artifact else None
+        if artifact is not None:
+            self.init_from_artifact(artifact)
+            return
+
         # Initialize infrastructure with nodes and links
         self.init_infrastructure_nodes()
         self.init_infrastructure_links()
 
+        # Precompute the transmission costs along the shortest paths
+        self.init_path_matrices()
+
+        if use_artifact:
+            save_artifact(artifact_path(config_file), self.compile())
+
+    def _default_build(self) -> bool:
+        """Whether the infrastructure is built by the methods of BaseScenario, i.e., can be compiled."""
+        methods = ('init_infrastructure_nodes', 'init_infrastructure_links', 'init_path_matrices', 
+                   'get_location', 'calculate_base_latency', 'calculate_energy_coef', 
+                   'add_unilateral_link', 'add_bilateral_links')
+        return all(getattr(type(self), name) is getattr(BaseScenario, name) for name in methods)
+
+    def _links_in_creation_order(self) -> List[Link]:
+        """Return the links in the order init_infrastructure_links created them."""
+        links, keys = [], {}
+        for edge_info in self.json_edges:
+            src_name = self.node_id2name[edge_info['SrcNodeID']]
+            dst_name = self.node_id2name[edge_info['DstNodeID']]
+            pairs = [(src_name, dst_name)]
+            if edge_info['EdgeType'] != 'SingleLink':
+                pairs.append((dst_name, src_name))
+            for pair in pairs:
+                key = keys[pair] = keys.get(pair, -1) + 1
+                links.append(self.get_link(*pair, key))
+        return links
+
+    def compile(self) -> Dict[str, np.ndarray]:
+        """
+        Compile the infrastructure into arrays:
+            - node_*: the node attributes, in order of creation.
+            - link_*: the link attributes, in order of creation, with the node ids of their ends.
+            - adj_indptr, adj_links: CSR adjacency, the links leaving node i being 
+              adj_links[adj_indptr[i]:adj_indptr[i + 1]] (indices in the link arrays).
+            - route_hops, route_links: the routing table, the links of the shortest path from 
+              node i to node j being route_links[i, j, :route_hops[i, j]] (-1 hops if unreachable).
+            - path_latency, path_hops, path_energy_coef: see :meth:`init_path_matrices`.
+        Arrays are indexed by node ids.
+        """
+        nodes = list(self.get_nodes().values())
+        links = self._links_in_creation_order()
+        link_pos = {id(link): i for i, link in enumerate(links)}
+        n = len(self.node_id2name)
+
+        def location(node, attr):
+            return getattr(node.location, attr) if node.location is not None else np.nan
+
+        arrays = {
+            'node_id': np.array([node.node_id for node in nodes], dtype=np.int64),
+            'node_name': np.array([node.name for node in nodes], dtype=str),
+            'node_max_cpu_freq': np.array([node.max_cpu_freq for node in nodes]),
+            'node_max_buffer_size': np.array([node.task_buffer.max_size for node in nodes]),
+            'node_idle_energy_coef': np.array([node.idle_energy_coef for node in nodes]),
+            'node_exe_energy_coef': np.array([node.exe_energy_coef for node in nodes]),
+            'node_loc_x': np.array([location(node, 'x') for node in nodes], dtype=float),
+            'node_loc_y': np.array([location(node, 'y') for node in nodes], dtype=float),
+            'link_src': np.array([link.src.node_id for link in links], dtype=np.int64),
+            'link_dst': np.array([link.dst.node_id for link in links], dtype=np.int64),
+            'link_max_bandwidth': np.array([link.max_bandwidth for link in links]),
+            'link_base_latency': np.array([link.base_latency for link in links]),
+            'link_energy_coef': np.array([link.energy_coef for link in links]),
+        }
+
+        order = np.argsort(arrays['link_src'], kind='stable')
+        arrays['adj_indptr'] = np.searchsorted(arrays['link_src'][order], np.arange(n + 1))
+        arrays['adj_links'] = order
+
+        routes = {}
+        for (src_name, dst_name, weight), path in self.infrastructure.routing_table.items():
+            if weight is None:
+                routes[self.node_name2id[src_name], self.node_name2id[dst_name]] = \
+                    None if path is None else [link_pos[id(link)] for link in path]
+        max_hops = max((len(path) for path in routes.values() if path), default=0)
+        arrays['route_hops'] = np.full((n, n), -1, dtype=np.int64)
+        arrays['route_links'] = np.full((n, n, max(max_hops, 1)), -1, dtype=np.int64)
+        for (src_id, dst_id), path in routes.items():
+            if path is not None:
+                arrays['route_hops'][src_id, dst_id] = len(path)
+                arrays['route_links'][src_id, dst_id, :len(path)] = path
+
+        arrays['path_latency'] = self.path_latency
+        arrays['path_hops'] = self.path_hops
+        arrays['path_energy_coef'] = self.path_energy_coef
+        return arrays
+
+    def init_from_artifact(self, arrays: Dict[str, np.ndarray]):
+        """Initialize the infrastructure, routing table and path matrices from compiled arrays."""
+        columns = {name: array.tolist() for name, array in arrays.items() 
+                   if name.startswith('node_') or name.startswith('link_')}
+        for node_id, name, max_cpu_freq, max_buffer_size, idle_energy_coef, exe_energy_coef, x, y in zip(
+                columns['node_id'], columns['node_name'], columns['node_max_cpu_freq'], 
+                columns['node_max_buffer_size'], columns['node_idle_energy_coef'], 
+                columns['node_exe_energy_coef'], columns['node_loc_x'], columns['node_loc_y']):
+            node = Node(
+                node_id=node_id,
+                name=name,
+                max_cpu_freq=max_cpu_freq,
+                max_buffer_size=max_buffer_size,
+                location=None if np.isnan(x) else Location(x, y),
+                idle_energy_coef=idle_energy_coef,
+                exe_energy_coef=exe_energy_coef
+            )
+            self.infrastructure.add_node(node)
+            self.node_id2name[node_id] = name
+            self.node_name2id[name] = node_id
+
+        links = []
+        for src_id, dst_id, max_bandwidth, base_latency, energy_coef in zip(
+                columns['link_src'], columns['link_dst'], columns['link_max_bandwidth'], 
+                columns['link_base_latency'], columns['link_energy_coef']):
+            link = Link(self.get_node(self.node_id2name[src_id]), self.get_node(self.node_id2name[dst_id]), 
+                        max_bandwidth=max_bandwidth, base_latency=base_latency, energy_coef=energy_coef)
+            self.infrastructure.add_link(link)
+            links.append(link)
+
+        self.infrastructure.set_compiled_routes(arrays['route_hops'], arrays['route_links'], links)
+        self.path_latency = arrays['path_latency']
+        self.path_hops = arrays['path_hops']
+        self.path_energy_coef = arrays['path_energy_coef']
+
     def load_config(self, config_file: str) -> dict:
         """Load the configuration file and return its content as a JSON object."""
         with open(config_file, 'r') as fr:
@@ -56,6 +190,36 @@ class BaseScenario(metaclass=ABCMeta):
             self.node_id2name[node_info['NodeId']] = node_info['NodeName']
             self.node_name2id[node_info['NodeName']] = node_info['NodeId']
 
+    def init_path_matrices(self):
+        """
+        Build dense N x N matrices, indexed by node ids, of the wired links in the shortest path 
+        between every pair of nodes:
+            - path_latency: summed base latency of the links.
+            - path_hops: number of links.
+            - path_energy_coef: summed energy coefficient of the links.
+
+        Unreachable pairs are set to inf. Call it again after modifying the topology.
+        """
+        n = len(self.node_id2name)
+        self.path_latency = np.full((n, n), np.inf)
+        self.path_hops = np.full((n, n), np.inf)
+        self.path_energy_coef = np.full((n, n), np.inf)
+
+        self.infrastructure.build_routing_table()
+        for (src_name, dst_name, weight), links in self.infrastructure.routing_table.items():
+            if weight is not None or links is None:
+                continue
+            src_id, dst_id = self.node_name2id[src_name], self.node_name2id[dst_name]
+            # Wireless hops are given as (src_name, dst_name) tuples and are free of charge
+            wired_links = [link for link in links if isinstance(link, Link)]
+            latency, energy_coef = 0, 0
+            for link in wired_links:
+                latency += link.base_latency
+                energy_coef += link.energy_coef
+            self.path_latency[src_id, dst_id] = latency
+            self.path_hops[src_id, dst_id] = len(wired_links)
+            self.path_energy_coef[src_id, dst_id] = energy_coef
+
     def get_location(self, node_info: dict) -> Optional[Location]:
         """Return a Location object if coordinates are provided, otherwise None."""
         if 'LocX' in node_info and 'LocY' in node_info:
@@ -190,6 +354,10 @@ class BaseScenario(metaclass=ABCMeta):
         """Return all links in the infrastructure."""
         return self.infrastructure.get_links()
 
+    def get_state(self) -> InfrastructureState:
+        """Return the array-backed state of the nodes and links in the infrastructure."""
+        return self.infrastructure.get_state()
+
     def add_unilateral_link(self, src_name: str, dst_name: str, bandwidth: float, base_latency: float = 0, energy_coef: float = 0.0):
         """Add a unilateral link between two nodes."""
         self.infrastructure.add_link(
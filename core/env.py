@@ -1,20 +1,31 @@
+import heapq
 import json
+import logging
+import math
 import os
 import simpy
 import networkx as nx
+import numpy as np
 
+from collections.abc import Mapping
 from typing import Optional, Tuple, List
 from core.base_scenario import BaseScenario
 from core.infrastructure import Link, Node
-from core.task import Task
+from core.kernel import ProcessKernel
+from core.task import Task, TaskPool
 
 # Public interfaces
-__all__ = ["EnvLogger", "Env"]
+__all__ = ["TaskRecords", "EnvLogger", "Env"]
 
 # Task status flags
 FLAG_TASK_EXECUTION_DONE = 0
+FLAG_TASK_EXECUTION_FAILED = 1
 ENERGY_UNIT_CONVERSION = 1
 
+# Bump when a change of the simulator alters its results, to invalidate the cached fitness 
+# (see policies.npga.fitness_cache)
+SIMULATOR_VERSION = 1
+
 
 def user_defined_info(task):
     """ Define additional information for completed tasks, such as checking if the deadline is violated."""
@@ -22,21 +33,250 @@ def user_defined_info(task):
     return {'ddl_ok': total_time <= task.ddl}
 
 
+def _json_default(obj):
+    """Serialize NumPy scalars (e.g., task ids read with pandas) in the structured log file."""
+    return obj.item() if hasattr(obj, 'item') else str(obj)
+
+
+class TaskRecords(Mapping):
+    """Columnar store of the task records, with running aggregates.
+
+    Each task is a row of preallocated typed columns, grown by doubling. The store is also a 
+    read-only mapping from task id to the legacy record tuple:
+        - success: (0, (src_name, dst_name), [trans_time, wait_time, exe_time], [exe_energy, trans_energy])
+        - failure: (status_code, (src_name, dst_name), [error], [trans_energy, 0])
+
+    Observers subscribed with :meth:`subscribe` are notified of the first record of every task 
+    through ``observe(task_id, status, src_name, dst_name, latency, energy)``, and reset on 
+    :meth:`clear`. A record replacing another one of the same task id (e.g., a duplicate task id 
+    failure overwritten by the completion of the live task) is not notified again, so that each 
+    task is counted once.
+
+    Attributes:
+        n_success: Number of successful tasks.
+        success_time_sum: Total latency (trans + wait + exe time) of the successful tasks.
+        energy_sum: Total energy (trans + exe energy) of all tasks.
+    """
+
+    FLOAT_COLUMNS = ('trans_time', 'wait_time', 'exe_time', 'trans_energy', 'exe_energy')
+
+    def __init__(self, capacity: int = 1024):
+        self._rows: dict = {}  # task id -> row
+        self._task_ids: list = []  # row -> task id
+        self._names: list = []  # interned node names
+        self._name_codes: dict = {}
+        self._errors: list = []  # interned error names
+        self._error_codes: dict = {}
+        self._observers: list = []
+        self._columns = {
+            'status': np.zeros(capacity, dtype=np.int8),
+            'src': np.zeros(capacity, dtype=np.int32),
+            'dst': np.zeros(capacity, dtype=np.int32),
+            'error': np.zeros(capacity, dtype=np.int16),
+            **{name: np.zeros(capacity) for name in self.FLOAT_COLUMNS},
+        }
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records and reset the aggregates, keeping the allocated capacity."""
+        self._rows.clear()
+        self._task_ids.clear()
+        self.n_success = 0
+        self.success_time_sum = 0.0
+        self.energy_sum = 0.0
+        for observer in self._observers:
+            observer.reset()
+
+    def subscribe(self, observer) -> None:
+        """Notify an observer (e.g., streaming metrics) of the first record of every task."""
+        self._observers.append(observer)
+
+    def __len__(self) -> int:
+        return len(self._task_ids)
+
+    def __iter__(self):
+        return iter(self._task_ids)
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._rows
+
+    def __getitem__(self, task_id) -> tuple:
+        row = self._rows[task_id]
+        c = self._columns
+        node_names = (self._names[c['src'][row]], self._names[c['dst'][row]])
+        status = int(c['status'][row])
+        if status == FLAG_TASK_EXECUTION_DONE:
+            return (status, node_names,
+                    [float(c['trans_time'][row]), float(c['wait_time'][row]), float(c['exe_time'][row])],
+                    [float(c['exe_energy'][row]), float(c['trans_energy'][row])])
+        return (status, node_names, [self._errors[c['error'][row]]], [float(c['trans_energy'][row]), 0])
+
+    @staticmethod
+    def _intern(value, values: list, codes: dict) -> int:
+        """Return the code of a value, adding it to the table if needed."""
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def _row_of(self, task_id) -> int:
+        """Return the row of a task, allocating one (and capacity if needed) for a new task."""
+        row = self._rows.get(task_id)
+        if row is not None:
+            self._aggregate(row, -1)
+            return row
+        row = self._rows[task_id] = len(self._task_ids)
+        self._task_ids.append(task_id)
+        if row == len(self._columns['status']):
+            for name, column in self._columns.items():
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:row] = column
+                self._columns[name] = grown
+        return row
+
+    def _aggregate(self, row: int, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a row from the running aggregates."""
+        c = self._columns
+        if c['status'][row] == FLAG_TASK_EXECUTION_DONE:
+            self.n_success += sign
+            self.success_time_sum += sign * float(c['trans_time'][row] + c['wait_time'][row] + c['exe_time'][row])
+        self.energy_sum += sign * float(c['trans_energy'][row] + c['exe_energy'][row])
+
+    def add(self, task_id, status: int, src_name: str, dst_name: Optional[str], 
+            trans_time: float = 0, wait_time: float = 0, exe_time: float = 0, 
+            trans_energy: float = 0, exe_energy: float = 0, error: Optional[str] = None) -> None:
+        """Record a task, replacing any previous record with the same task id."""
+        first_record = task_id not in self._rows
+        row = self._row_of(task_id)
+        c = self._columns
+        c['status'][row] = status
+        c['src'][row] = self._intern(src_name, self._names, self._name_codes)
+        c['dst'][row] = self._intern(dst_name, self._names, self._name_codes)
+        c['error'][row] = -1 if error is None else self._intern(error, self._errors, self._error_codes)
+        c['trans_time'][row] = trans_time
+        c['wait_time'][row] = wait_time
+        c['exe_time'][row] = exe_time
+        c['trans_energy'][row] = trans_energy
+        c['exe_energy'][row] = exe_energy
+        self._aggregate(row, 1)
+        if not first_record:
+            return
+        for observer in self._observers:
+            observer.observe(task_id, status, src_name, dst_name, 
+                             trans_time + wait_time + exe_time, trans_energy + exe_energy)
+
+    def add_legacy(self, task_id, value: tuple) -> None:
+        """Record a task given as a legacy record tuple."""
+        status, (src_name, dst_name), time_list, energy_list = value
+        if status == FLAG_TASK_EXECUTION_DONE:
+            self.add(task_id, status, src_name, dst_name, *time_list, 
+                     trans_energy=energy_list[1], exe_energy=energy_list[0])
+        else:
+            self.add(task_id, status, src_name, dst_name, 
+                     trans_energy=energy_list[0], error=time_list[0])
+
+    def to_numpy(self) -> dict:
+        """Export the records as a dict of NumPy arrays (copies), with node and error names decoded."""
+        n = len(self)
+        c = self._columns
+        names = np.array(self._names, dtype=object)
+        errors = np.array(self._errors + [None], dtype=object)  # code -1 decodes to None
+        return {
+            'task_id': np.array(self._task_ids),
+            'status': c['status'][:n].copy(),
+            'src': names[c['src'][:n]],
+            'dst': names[c['dst'][:n]],
+            'error': errors[c['error'][:n]],
+            **{name: c[name][:n].copy() for name in self.FLOAT_COLUMNS},
+        }
+
+    def to_pandas(self):
+        """Export the records as a pandas DataFrame, one row per task."""
+        import pandas as pd
+        return pd.DataFrame(self.to_numpy())
+
+
 class EnvLogger:
-    """Logger for recording simulation events and key information."""
+    """Logger for recording simulation events and key information.
 
-    def __init__(self, controller, enable_logging: bool = True, decimal_places: int = 3):
+    Log messages are filtered by level (the standard `logging` levels) and formatted lazily, 
+    so that a disabled logger costs a single comparison per event. Messages are printed to 
+    the console if enable_logging is set, and written as JSON lines to log_file if provided.
+    """
+
+    def __init__(self, controller, enable_logging: bool = True, decimal_places: int = 3, 
+                 level: int = logging.INFO, log_file: Optional[str] = None):
         self.controller = controller
-        self.enable_logging = enable_logging  # Disable logging to speed up training
         self.decimal_places = decimal_places
-        self.task_info: dict = {}  # Records task-related information
+        self.sink = open(log_file, 'a') if log_file else None  # Structured log file
+        self._enable_logging = enable_logging  # Disable logging to speed up training
+        self._level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+        self._update_threshold()
+        self.task_info = TaskRecords()  # Records task-related information
         self.node_info: dict = {}  # Records node-related information
 
-    def log(self, message):
-        """Log a message with a timestamp if logging is enabled."""
-        if self.enable_logging:
-            timestamp = f"{self.controller.now:.{self.decimal_places}f}"
-            print(f"[{timestamp}]: {message}")
+    @property
+    def enable_logging(self) -> bool:
+        """Whether log messages are printed to the console."""
+        return self._enable_logging
+
+    @enable_logging.setter
+    def enable_logging(self, value: bool):
+        self._enable_logging = value
+        self._update_threshold()
+
+    @property
+    def level(self) -> int:
+        """The minimum level of the logged messages."""
+        return self._level
+
+    @level.setter
+    def level(self, value: int):
+        self._level = value
+        self._update_threshold()
+
+    def _update_threshold(self):
+        """Compute the minimum level of the emitted messages, +inf if there is no output."""
+        has_output = self._enable_logging or self.sink is not None
+        self._threshold = self._level if has_output else math.inf
+
+    def is_enabled_for(self, level: int) -> bool:
+        """Whether a message of the given level would be emitted."""
+        return level >= self._threshold
+
+    def log(self, message: str, *args, level: int = logging.INFO, **fields):
+        """
+        Log a message with a timestamp if its level is enabled.
+
+        Args:
+            message (str): The message, %-formatted with args only if it is emitted.
+            *args: The arguments of the message.
+            level (int): The level of the message.
+            **fields: Additional fields written to the structured log file, e.g., task_id.
+        """
+        if level < self._threshold:
+            return
+        if args:
+            message = message % args
+        now = self.controller.now
+        if self._enable_logging:
+            print(f"[{now:.{self.decimal_places}f}]: {message}")
+        if self.sink is not None:
+            record = {'time': now, 'level': logging.getLevelName(level), 'message': message, **fields}
+            self.sink.write(json.dumps(record, default=_json_default) + "\n")
+
+    def flush(self) -> None:
+        """Flush the structured log file."""
+        if self.sink is not None:
+            self.sink.flush()
+
+    def close(self) -> None:
+        """Close the structured log file."""
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
+            self._update_threshold()
 
     def append(self, info_type: str, key: str, value: tuple) -> None:
         """
@@ -49,10 +289,12 @@ class EnvLogger:
                 - For 'task': (status_code, (src_name, dst_name), 
                 - For 'node': Energy consumption value.
         """
-        if info_type not in ['task', 'node']:
+        if info_type == 'task':
+            self.task_info.add_legacy(key, value)
+        elif info_type == 'node':
+            self.node_info[key] = value
+        else:
             raise ValueError("info_type must be 'task' or 'node'")
-        target_dict = self.task_info if info_type == 'task' else self.node_info
-        target_dict[key] = value
         
     def get_value_idx(self, key: str) -> int:
         
@@ -71,10 +313,20 @@ class EnvLogger:
 
 
 class Env:
-    """Simulation environment."""
+    """Simulation environment.
+
+    The tasks run as generator processes on the controller, selected by `controller`: 
+    "simpy" (simpy.Environment, the default) or "kernel" (core.kernel.ProcessKernel, the same 
+    processes on a lighter heap-based kernel, with the same results; the visualization frame 
+    recorder is not supported).
+    """
+
+    CONTROLLERS = ("simpy", "kernel")
 
     def __init__(self, scenario: BaseScenario, config_file: str, verbose: bool = True, 
-                 decimal_places: int = 2):
+                 decimal_places: int = 2, event_driven: bool = False, 
+                 log_level: int = logging.INFO, log_file: Optional[str] = None, 
+                 task_pool: Optional[TaskPool] = None, controller: str = "simpy"):
         # Load configuration file
         with open(config_file, 'r') as file:
             self.config = json.load(file)
@@ -82,34 +334,31 @@ class Env:
             
         # Initialize simulation parameters
         self.refresh_rate = 1  # Typically, setting the refresh rate to 1 is OK.
+        self.event_driven = event_driven  # Skip idle refresh ticks in the run loops
         self.decimal_places = decimal_places
         self.scenario = scenario
-        self.controller = simpy.Environment()
-        self.logger = EnvLogger(self.controller, enable_logging=verbose, decimal_places=decimal_places)
+        if controller not in self.CONTROLLERS:
+            raise ValueError(f"Unknown controller {controller!r}: expected one of {self.CONTROLLERS}.")
+        self.controller_type = controller
+        self.controller = self._make_controller()
+        self.logger = EnvLogger(self.controller, enable_logging=verbose, decimal_places=decimal_places, 
+                                level=log_level, log_file=log_file)
 
         # Task and state management
         self.active_tasks: dict = {}  # Current active tasks
         self.done_task_info: list = []  # Information of completed tasks
-        self.done_task_collector = simpy.Store(self.controller)
+        self.failed_task_info: list = []  # Information of failed tasks
         self.task_count = 0  # Counter for processed tasks
+        self.wakeups: list = []  # Heap of pending task launch / transmission / execution end times
+        self.task_pool = task_pool  # Receives the finished tasks for reuse, if set
 
         # self.processed_tasks = []  # for debug
 
-        # Reset environment state
-        self.reset()
-
-        # Start monitoring process
-        self.monitor_process = self.controller.process(self._monitor_done_task_collector())
-        self.energy_recorders = {
-            node.node_id: self.controller.process(self._track_node(node))
-            for node in self.scenario.get_nodes().values()
-        }
-
-        # Start visualization frame recorder if enabled
         if self.config['Basic']['VisFrame'] == "on":
             self._setup_visualization_directories()
-            self.frame_info: dict = {}
-            self.frame_recorder = self.controller.process(self._record_frame_info())
+
+        # Reset environment state, which also starts the node and frame recorders
+        self.reset()
 
     def _validate_config(self) -> None:
         """Validate configuration to ensure the number of tracked nodes does not exceed the limit."""
@@ -124,99 +373,168 @@ class Env:
         os.makedirs(self.config['VisFrame']['LogInfoPath'], exist_ok=True)
         os.makedirs(self.config['VisFrame']['LogFramesPath'], exist_ok=True)
 
+    def _make_controller(self):
+        """Create the controller running the task processes, at time 0."""
+        if self.controller_type == "kernel":
+            if self.config['Basic']['VisFrame'] == "on":
+                raise ValueError("The kernel controller does not support the visualization frame recorder (VisFrame).")
+            return ProcessKernel()
+        return simpy.Environment()
+
     @property
     def now(self) -> float:
         """Get the current simulation time."""
         return self.controller.now
 
     def run(self, until: float):
-        """Run the simulation until the specified time."""
+        """Run the simulation until the specified time.
+
+        Task failures do not interrupt the run: they are recorded in the logger with a 
+        non-zero status code and in failed_task_info.
+        """
         self.controller.run(until)
 
+    def next_event_time(self) -> float:
+        """Get the time of the next pending task launch, transmission end or execution end."""
+        while self.wakeups and self.wakeups[0] < self.now:
+            heapq.heappop(self.wakeups)
+        return self.wakeups[0] if self.wakeups else math.inf
+
+    def next_until(self, until: float, time: Optional[float] = None) -> float:
+        """
+        Get the next stop time of a run loop that polls the simulation on the refresh_rate grid.
+
+        In polling mode, this is simply the next refresh tick. In event-driven mode, idle ticks 
+        are skipped: the loop jumps to the first tick at or after `time` (typically the next task 
+        arrival), or, if `time` is None, at or after the next meaningful event. The stop times 
+        stay on the same grid, so the results are identical to those of the polling loop.
+
+        Args:
+            until (float): The current stop time of the run loop.
+            time (Optional[float]): The time to reach, e.g., the generation time of the next task.
+
+        Returns:
+            float: The next stop time to pass to :meth:`run`.
+        """
+        if not self.event_driven:
+            return until + self.refresh_rate
+
+        if time is None:
+            next_event_time = self.next_event_time()
+            time = next_event_time if next_event_time < math.inf else self.now
+
+        now, refresh_rate = self.now, self.refresh_rate
+        while until <= now or until < time:
+            until += refresh_rate
+        return until
+
     def reset(self):
-        """Reset the simulation environment."""
-        # Interrupt all active tasks
-        for task_process in self.active_tasks.values():
-            if task_process.is_alive:
-                task_process.interrupt()
+        """
+        Reset the simulation environment to its initial state at time 0, as built.
+
+        The pending processes are dropped with the previous controller, so that the 
+        environment (and its scenario, whose routing tables and path matrices are kept) can be 
+        reused for a new epoch instead of being rebuilt from the configuration files.
+        """
+        self.controller = self._make_controller()
+        self.logger.controller = self.controller
         self.active_tasks.clear()
         self.task_count = 0
+        self.wakeups.clear()
 
         # Reset scenario and logger
         self.scenario.reset()
         self.logger.reset()
-        self.done_task_collector.items.clear()
         self.done_task_info.clear()
+        self.failed_task_info.clear()
+
+        # Start node recorders
+        self.node_ticks = {node.node_id: 0 for node in self.scenario.get_nodes().values()}
+
+        # Start visualization frame recorder if enabled
+        if self.config['Basic']['VisFrame'] == "on":
+            self.frame_info: dict = {}
+            self.frame_recorder = self.controller.process(self._record_frame_info())
 
     def process(self, **kwargs):
         """Process a task using keyword arguments."""
         task_process = self._execute_task(**kwargs)
         self.controller.process(task_process)
+        heapq.heappush(self.wakeups, self.now)
 
-    def _check_duplicate_task_id(self, task: Task, dst_name: Optional[str]):
+    def _record_task_failure(self, task: Task, dst_name: Optional[str], error: str, detail: str, 
+                             *args, trans_energy: float = 0):
         """
-        Check if the task ID is duplicated, log the error and raise an exception if it is.
+        Record a failed task: count it as processed, log it with a non-zero status code and 
+        append it to failed_task_info.
+
+        Args:
+            task (Task): The failed task.
+            dst_name (Optional[str]): The destination node name.
+            error (str): The error name, e.g., 'NetCongestionError'.
+            detail (str): The log message describing the failure, %-formatted with args.
+            *args: The arguments of the log message.
+            trans_energy (float): The transmission energy already spent on the task.
+        """
+        self.task_count += 1
+        self.logger.task_info.add(task.task_id, FLAG_TASK_EXECUTION_FAILED, task.src_name, dst_name, 
+                                  trans_energy=trans_energy, error=error)
+        self.failed_task_info.append((self.now, task.task_id, FLAG_TASK_EXECUTION_FAILED, [dst_name, error]))
+        self.logger.log("**%s: Task {%s}** " + detail, error, task.task_id, *args, 
+                        level=logging.WARNING, task_id=task.task_id, error=error)
+        # A duplicate submission of an active task must not recycle the running one
+        if self.task_pool is not None and self.active_tasks.get(task.task_id) is not task:
+            self.task_pool.release(task)
+
+    def _check_duplicate_task_id(self, task: Task, dst_name: Optional[str]) -> bool:
+        """
+        Check if the task ID is duplicated and record the failure if it is.
 
         Args:
             task (Task): The task to check.
             dst_name (Optional[str]): The destination node name.
 
-        Raises:
-            AssertionError: If the task ID is duplicated.
+        Returns:
+            bool: Whether the task ID is duplicated.
         """
         if task.task_id in self.active_tasks.keys():
-            self.task_count += 1
-            self.logger.append(info_type='task', 
-                               key=task.task_id, 
-                               value=(1, (task.src_name, dst_name), ['DuplicateTaskIdError'], [0, 0]))
-            log_info = f"**DuplicateTaskIdError: Task {{{task.task_id}}}** " \
-                       f"new task (name {{{task.task_name}}}) with a " \
-                       f"duplicate task id {{{task.task_id}}}."
-            self.logger.log(log_info)
-            raise AssertionError(('DuplicateTaskIdError', log_info, task.task_id))
-
-    def _handle_task_transmission(self, task: Task, dst_name: str):
+            self._record_task_failure(task, dst_name, 'DuplicateTaskIdError', 
+                                      "new task (name {%s}) with a duplicate task id {%s}.", 
+                                      task.task_name, task.task_id)
+            return True
+        return False
+
+    def _start_transmission(self, task: Task, dst_name: str) -> bool:
         """
-        Handle the transmission logic of the task, including path calculation, error handling, and time simulation.
+        Start the transmission of the task: path calculation, error handling and bandwidth reservation.
+        The transmission ends task.trans_time later, with :meth:`_end_transmission`.
 
         Args:
             task (Task): The task to transmit.
             dst_name (str): The destination node name.
 
-        Raises:
-            EnvironmentError: If transmission fails due to network issues.
+        Returns:
+            bool: False if the transmission failed due to network issues, True otherwise.
         """
         try:
             links_in_path = self.scenario.infrastructure.get_shortest_links(task.src_name, dst_name)
         except nx.exception.NetworkXNoPath:
-            self.task_count += 1
-            self.logger.append(info_type='task', 
-                               key=task.task_id, 
-                               value=(1, (task.src_name, dst_name), ['NetworkXNoPathError'], [0, 0]))
-            log_info = f"**NetworkXNoPathError: Task {{{task.task_id}}}** Node {{{dst_name}}} is inaccessible"
-            self.logger.log(log_info)
-            raise EnvironmentError(('NetworkXNoPathError', log_info, task.task_id))
+            self._record_task_failure(task, dst_name, 'NetworkXNoPathError', 
+                                      "Node {%s} is inaccessible", dst_name)
+            return False
         except EnvironmentError as e:
             message = e.args[0]
-            if message[0] == 'IsolatedWirelessNode':
-                self.task_count += 1
-                self.logger.append(info_type='task', 
-                                   key=task.task_id, 
-                                   value=(1, (task.src_name, dst_name), ['IsolatedWirelessNode'], [0, 0]))
-                log_info = f"**IsolatedWirelessNode: Task {{{task.task_id}}}** Isolated wireless node detected"
-                self.logger.log(log_info)
-                raise e
+            if message[0] != 'IsolatedWirelessNode':
+                raise
+            self._record_task_failure(task, dst_name, 'IsolatedWirelessNode', 
+                                      "Isolated wireless node detected")
+            return False
 
         for link in links_in_path:
             if isinstance(link, Link) and link.free_bandwidth < task.trans_bit_rate:
-                self.task_count += 1
-                self.logger.append(info_type='task', 
-                                   key=task.task_id, 
-                                   value=(1, (task.src_name, dst_name), ['NetCongestionError'], [0, 0]))
-                log_info = f"**NetCongestionError: Task {{{task.task_id}}}** " \
-                           f"network congestion Node {{{task.src_name}}} --> {{{dst_name}}}"
-                self.logger.log(log_info)
-                raise EnvironmentError(('NetCongestionError', log_info, task.task_id))
+                self._record_task_failure(task, dst_name, 'NetCongestionError', 
+                                          "network congestion Node {%s} --> {%s}", task.src_name, dst_name)
+                return False
 
         task.trans_time = 0
         task.trans_energy = 0
@@ -233,85 +551,87 @@ class Env:
             task.trans_time += 0  # Placeholder, to be implemented with actual calculation
             links_in_path = links_in_path[:-1]
 
-        # Wired transmission: base latency and multi-hop delay
-        trans_base_latency = 0
-        trans_energy = 0
-        for link in links_in_path:
-            trans_base_latency += link.base_latency
-            trans_energy += link.energy_coef * task.task_size
-        task.trans_time += trans_base_latency
+        # Wired transmission: base latency and multi-hop delay, precomputed along the path
+        src_id, dst_id = self.scenario.node_name2id[task.src_name], self.scenario.node_name2id[dst_name]
+        task.trans_time += float(self.scenario.path_latency[src_id, dst_id])
         task.trans_time += (task.task_size / task.trans_bit_rate) * len(links_in_path)
-        task.trans_energy += trans_energy
+        task.trans_energy += float(self.scenario.path_energy_coef[src_id, dst_id]) * task.task_size
         
         # Store the energy consumption of the transmission in the destination node
         self.scenario.get_node(dst_name).energy_consumption += task.trans_energy
 
         self.scenario.send_data_flow(task.trans_flow, links_in_path)
-        try:
-            self.logger.log(f"Task {{{task.task_id}}}: {{{task.src_name}}} --> {{{dst_name}}}")
-            yield self.controller.timeout(task.trans_time)
-            task.trans_flow.deallocate()
-            self.logger.log(f"Task {{{task.task_id}}} arrived Node {{{dst_name}}} with "
-                            f"{{{task.trans_time:.{self.decimal_places}f}}}s")
-        except simpy.Interrupt:
-            pass
-
-    def _execute_task_on_node(self, task: Task, dst: Node, flag_reactive: bool):
+        self.logger.log("Task {%s}: {%s} --> {%s}", task.task_id, task.src_name, dst_name, 
+                        task_id=task.task_id)
+        heapq.heappush(self.wakeups, self.now + task.trans_time)
+        return True
+
+    def _end_transmission(self, task: Task, dst_name: str):
+        """Release the bandwidth of a task arriving at its destination node."""
+        task.trans_flow.deallocate()
+        self.logger.log("Task {%s} arrived Node {%s} with {%.*f}s", 
+                        task.task_id, dst_name, self.decimal_places, task.trans_time, 
+                        task_id=task.task_id)
+
+    def _start_execution(self, task: Task, dst: Node, flag_reactive: bool) -> bool:
         """
         Execute the task on the destination node, handling buffering and execution logic.
+        A task that starts executing completes task.exe_time later, with :meth:`_handle_task_completion`.
 
         Args:
             task (Task): The task to execute.
             dst: The destination node.
             flag_reactive (bool): Whether the task is from the waiting queue.
 
-        Raises:
-            EnvironmentError: If there is insufficient buffer space.
+        Returns:
+            bool: True if the task starts executing, False if it is buffered or failed.
+
+        The task fails with an InsufficientBufferError if it has to wait and does not fit in the buffer.
         """
 
         if not dst.free_cpu_freq > 0:
-            try:
-                task.allocate(self.now, dst, pre_allocate=True)
-                dst.append_task(task)
-                self.logger.log(f"Task {{{task.task_id}}} is buffered in Node {{{task.dst_name}}}")
-                return
-            except EnvironmentError as e:
-                self.task_count += 1
-                self.logger.append(info_type='task', 
-                                   key=task.task_id, 
-                                   value=(1, (task.src_name, dst.name), ['InsufficientBufferError'], [task.trans_energy, 0]))
-                self.logger.log(e.args[0][1])
-                raise e
-
+            task.allocate(self.now, dst, pre_allocate=True)
+            if task.task_size > dst.buffer_free_size():
+                self._record_task_failure(task, dst.name, 'InsufficientBufferError', 
+                                          "insufficient buffer in Node {%s}", dst.name, 
+                                          trans_energy=task.trans_energy)
+                return False
+            dst.append_task(task)
+            self.logger.log("Task {%s} is buffered in Node {%s}", task.task_id, task.dst_name, 
+                            task_id=task.task_id)
+            return False
+
+        self._track_node(dst)
         if flag_reactive:
 
             task.allocate(self.now)
-            self.logger.log(f"Task {{{task.task_id}}} re-actives in Node {{{task.dst_name}}}, "
-                            f"waiting {{{(task.wait_time):.{self.decimal_places}f}}}s")
+            self.logger.log("Task {%s} re-actives in Node {%s}, waiting {%.*f}s", 
+                            task.task_id, task.dst_name, self.decimal_places, task.wait_time, 
+                            task_id=task.task_id)
         else:
             task.allocate(self.now, dst)
 
         self.active_tasks[task.task_id] = task
-        try:
-            self.logger.log(f"Processing Task {{{task.task_id}}} in {{{task.dst_name}}}")
-            yield self.controller.timeout(task.exe_time)
-            self.done_task_collector.put(
-                (task.task_id,
-                 FLAG_TASK_EXECUTION_DONE,
-                 [dst.name, user_defined_info(task)]))
-        except simpy.Interrupt:
-            pass
+        self.logger.log("Processing Task {%s} in {%s}", task.task_id, task.dst_name, 
+                        task_id=task.task_id)
+        heapq.heappush(self.wakeups, self.now + task.exe_time)
+        return True
 
-    def _execute_task(self, task: Task, dst_name: Optional[str] = None):
+    def _start_task(self, task: Task, dst_name: Optional[str] = None) -> Tuple[Optional[Node], bool]:
         """
-        Handle the transmission and execution logic of the task.
+        Handle the launch of a task, or the re-activation of a task from the waiting queue.
 
         Args:
             task (Task): The task to execute.
             dst_name (Optional[str]): The destination node name. If None, the task is from the waiting queue.
+
+        Returns:
+            Tuple[Optional[Node], bool]: The destination node (None if the task failed) and whether 
+                the task has to be transmitted first.
         """
         # Check for duplicate task ID
-        self._check_duplicate_task_id(task, dst_name)
+        if self._check_duplicate_task_id(task, dst_name):
+            return None, False
 
         # Determine if the task is from the waiting queue
         flag_reactive = dst_name is None
@@ -320,82 +640,113 @@ class Env:
         dst = task.dst if flag_reactive else self.scenario.get_node(dst_name)
 
         if not flag_reactive:
-            self.logger.log(f"Task {{{task.task_id}}} generated in Node {{{task.src_name}}}")
+            self.logger.log("Task {%s} generated in Node {%s}", task.task_id, task.src_name, 
+                            task_id=task.task_id)
 
             if dst_name != task.src_name:
                 # Handle task transmission
-                yield from self._handle_task_transmission(task, dst_name)
+                if not self._start_transmission(task, dst_name):
+                    return None, False
+                return dst, True
             else:
                 task.trans_time = 0  # No transmission needed
                 task.trans_energy = 0
+        return dst, False
+
+    def _execute_task(self, task: Task, dst_name: Optional[str] = None):
+        """
+        Handle the transmission and execution logic of the task, as a simpy process.
+
+        Args:
+            task (Task): The task to execute.
+            dst_name (Optional[str]): The destination node name. If None, the task is from the waiting queue.
+        """
+        dst, transmitted = self._start_task(task, dst_name)
+        if dst is None:
+            return
+        if transmitted:
+            try:
+                yield self.controller.timeout(task.trans_time)
+                self._end_transmission(task, dst_name)
+            except simpy.Interrupt:
+                pass
 
         # Execute the task on the node
-        yield from self._execute_task_on_node(task, dst, flag_reactive)
+        if self._start_execution(task, dst, flag_reactive=dst_name is None):
+            try:
+                yield self.controller.timeout(task.exe_time)
+                self._handle_task_completion(task, dst)
+            except simpy.Interrupt:
+                pass
 
-    def _monitor_done_task_collector(self):
-        """Monitor the done_task_collector queue to process completed tasks."""
-        while True:
-            # --- Check for Completed Tasks ---
-            if len(self.done_task_collector.items) > 0:
-                while len(self.done_task_collector.items) > 0:
-                    task_id, flag, info = self.done_task_collector.get().value
-                    self.done_task_info.append((self.now, task_id, flag, info))
-
-                    if flag == FLAG_TASK_EXECUTION_DONE:
-                        # Retrieve the task from active tasks
-                        task = self.active_tasks[task_id]
-
-                        # Pop the next task from the destination node's waiting queue
-                        waiting_task = task.dst.pop_task()
-                        
-                        self.scenario.get_node(task.dst_name).energy_consumption += task.exe_energy
-                        
-
-                        # Log task completion with execution time
-                        self.logger.log(f"Task {{{task_id}}}: Accomplished in "
-                                        f"Node {{{task.dst_name}}} with "
-                                        f"execution time {{{task.exe_time:.{self.decimal_places}f}}}s")
-
-                        # Record task statistics (success, times, node names)
-                        self.logger.append(info_type='task', 
-                                           key=task.task_id, 
-                                           value=(0, (task.src_name, task.dst_name),
-                                                    [task.trans_time, task.wait_time, task.exe_time], 
-                                                    [task.exe_energy, task.trans_energy])
-                                            )
-                                           
-                        
-                        # Clean up: deallocate resources and remove from active tasks
-                        task.deallocate()
-                        del self.active_tasks[task_id]
-                        self.task_count += 1
-                        # self.processed_tasks.append(task.task_id)
-
-                        # Process the next waiting task if it exists
-                        if waiting_task:
-                            self.process(task=waiting_task)
-
-                    else:
-                        # Handle invalid task flag with detailed error
-                        raise ValueError(f"Invalid flag '{flag}' encountered for task {task_id}")
-            
-            # --- Reset for Next Cycle ---
-            else:
-                self.done_task_info = []
-                # self.logger.log("")  # turn on: log on every time slot
+    def _handle_task_completion(self, task: Task, dst: Node):
+        """
+        Handle a completed task on its execution-end event: record it, free the node and 
+        start the next task waiting in the node's buffer.
+
+        Args:
+            task (Task): The completed task.
+            dst (Node): The node that executed the task.
+        """
+        self.done_task_info.append((self.now, task.task_id, FLAG_TASK_EXECUTION_DONE, 
+                                    [dst.name, user_defined_info(task)]))
+
+        # Pop the next task from the destination node's waiting queue
+        waiting_task = dst.pop_task()
+
+        dst.energy_consumption += task.exe_energy
+
+        # Log task completion with execution time
+        self.logger.log("Task {%s}: Accomplished in Node {%s} with execution time {%.*f}s", 
+                        task.task_id, task.dst_name, self.decimal_places, task.exe_time, 
+                        task_id=task.task_id)
+
+        # Record task statistics (success, times, node names)
+        self.logger.task_info.add(task.task_id, FLAG_TASK_EXECUTION_DONE, task.src_name, task.dst_name, 
+                                  task.trans_time, task.wait_time, task.exe_time, 
+                                  trans_energy=task.trans_energy, exe_energy=task.exe_energy)
+
+        # Clean up: deallocate resources and remove from active tasks
+        self._track_node(dst)
+        task.deallocate()
+        del self.active_tasks[task.task_id]
+        self.task_count += 1
+
+        if self.task_pool is not None:
+            self.task_pool.release(task)
+
+        # Process the next waiting task if it exists
+        if waiting_task:
+            self.process(task=waiting_task)
+
+    def _count_ticks(self, time: float) -> int:
+        """Count the refresh ticks (0, refresh_rate, 2 * refresh_rate, ...) strictly before the given time."""
+        ticks = time / self.refresh_rate
+        nearest = round(ticks)
+        # Times on the grid are accumulated sums of refresh_rate and carry rounding noise
+        return nearest if abs(ticks - nearest) < 1e-6 else math.ceil(ticks)
 
-            # Pause execution until the next refresh interval
-            yield self.controller.timeout(self.refresh_rate)
-    
     def _track_node(self, node: Node):
-        """Recorder of node's energy consumption."""
-        while True:
-            node.energy_consumption += node.idle_energy_coef * self.refresh_rate
-            # node.energy_consumption += node.exe_energy_coef * (
-            #     node.max_cpu_freq - node.free_cpu_freq) * self.refresh_rate
-            node.total_cpu_freq += (node.max_cpu_freq - node.free_cpu_freq) * self.refresh_rate
-            node.clock += self.refresh_rate
-            yield self.controller.timeout(self.refresh_rate)
+        """
+        Recorder of node's energy consumption, CPU usage and clock up to the current time.
+
+        The node is sampled once per refresh tick, as a per-node process waking up on every tick 
+        would do. Since the node state only changes when a task is added or removed, the ticks 
+        elapsed since the last call are accounted in closed form. Call it before changing the 
+        node state and before reading its counters.
+        """
+        ticks = self._count_ticks(self.now)
+        elapsed = (ticks - self.node_ticks[node.node_id]) * self.refresh_rate
+        if elapsed > 0:
+            node.energy_consumption += node.idle_energy_coef * elapsed
+            node.total_cpu_freq += (node.max_cpu_freq - node.free_cpu_freq) * elapsed
+            node.clock += elapsed
+            self.node_ticks[node.node_id] = ticks
+
+    def _track_nodes(self):
+        """Bring the recorders of all nodes up to the current time."""
+        for node in self.scenario.get_nodes().values():
+            self._track_node(node)
     
     def _record_frame_info(self):
         """Record simulation frame information at regular intervals."""
@@ -430,22 +781,27 @@ class Env:
     
     def avg_node_energy(self, node_name_list: Optional[List[str]] = None) -> float:
         """Calculate the average energy consumption across specified nodes."""
+        self._track_nodes()
         return self.scenario.avg_node_energy(node_name_list) / ENERGY_UNIT_CONVERSION
     
     def node_energy(self, node_name: str) -> float:
         """Retrieve the energy consumption of a specific node."""
+        self._track_nodes()
         return self.scenario.node_energy(node_name) / ENERGY_UNIT_CONVERSION
     
     def node_power(self, node_name: Optional[str] = None) -> float:
         """Retrieve the power consumption of a specific node."""
+        self._track_nodes()
         return self.scenario.node_power(node_name) / ENERGY_UNIT_CONVERSION
     
     def avg_node_power(self, node_name_list: Optional[List[str]] = None) -> float:
         """Calculate the average power consumption across specified nodes."""
+        self._track_nodes()
         return self.scenario.avg_node_power(node_name_list) / ENERGY_UNIT_CONVERSION
 
     def close(self):
         # Log energy consumption and CPU frequency per clock cycle for each node
+        self._track_nodes()
         for _, node in self.scenario.get_nodes().items():
             self.logger.append(info_type='node', 
                                key=node.node_id, 
@@ -463,15 +819,6 @@ class Env:
                 fw.write(frame_info_json_object)
 
         # --- Terminate Processes ---
-        # Interrupt the monitoring process
-        self.monitor_process.interrupt()
-
-        # Interrupt all active energy recorders and clear the collection
-        for p in self.energy_recorders.values():
-            if p.is_alive:
-                p.interrupt()
-        self.energy_recorders.clear()
-
         # Interrupt frame info recorder if visualization is enabled
         if self.config['Basic']['VisFrame'] == "on":
             self.frame_recorder.interrupt()
@@ -479,3 +826,4 @@ class Env:
         # --- Log Completion ---
         # Record simulation completion
         self.logger.log("Simulation completed!")
+        self.logger.flush()
@@ -1,11 +1,12 @@
 import math
 import networkx as nx
+import numpy as np
 import warnings
 
 from collections import deque, namedtuple
-from typing import Optional, Iterator, List, Dict
+from typing import Optional, Iterator, List, Dict, Tuple
 
-__all__ = ["Location", "Data", "DataFlow", "Buffer", "Node", "Link", "Infrastructure"]
+__all__ = ["Location", "Data", "DataFlow", "Buffer", "Node", "Link", "InfrastructureState", "BottleneckBandwidth", "Infrastructure"]
 
 # Named tuples for buffer and CPU status
 BufferStatus = namedtuple("BufferStatus", "free_size, max_size")
@@ -49,6 +50,8 @@ class Data(object):
         data_size (float): Size of the data in bits.
     """
 
+    __slots__ = ("data_size",)
+
     def __init__(self, data_size: float):
         """Initialize Data object with a specified data size."""
         self.data_size = data_size
@@ -66,6 +69,8 @@ class DataFlow(object):
         links (Optional[List[Link]]): The list of links involved in the data flow path.
     """
 
+    __slots__ = ("bit_rate", "links")
+
     def __init__(self, bit_rate: float):
         """Initialize DataFlow with a specified bit rate."""
         self.bit_rate = bit_rate
@@ -99,21 +104,43 @@ class Buffer(object):
     Attributes:
         max_size (int): The maximum buffer size.
         free_size (int): The current available buffer size.
+        task_ids (List[int]): Snapshot of the IDs of the buffered tasks, in FIFO order.
     """
 
+    __slots__ = ("buffer", "max_size", "state", "state_idx", "_free_size")
+
     def __init__(self, max_size):
         """Initialize a FIFO buffer with a specified maximum size."""
         self.buffer = deque()  # FIFO queue
-        self.task_ids = []  # List of task IDs
         self.max_size = max_size
+
+        # Mirror of free_size in the infrastructure state arrays, set by InfrastructureState
+        self.state: Optional["InfrastructureState"] = None
+        self.state_idx = None
         self.free_size = max_size
 
+    @property
+    def free_size(self):
+        """The current available buffer size."""
+        return self._free_size
+
+    @free_size.setter
+    def free_size(self, value):
+        self._free_size = value
+        if self.state is not None:
+            self.state.buffer_free_size[self.state_idx] = value
+            self.state.mark_node(self.state_idx)
+
+    @property
+    def task_ids(self) -> List[int]:
+        """Snapshot of the IDs of the buffered tasks, in FIFO order."""
+        return [task.task_id for task in self.buffer]
+
     def append(self, task: "Task"):
         """Append a task to the buffer if enough space is available."""
         if task.task_size <= self.free_size:
             self.free_size -= task.task_size
             self.buffer.append(task)
-            self.task_ids.append(task.task_id)
         else:
             raise EnvironmentError(
                 ('InsufficientBufferError', 
@@ -124,7 +151,6 @@ class Buffer(object):
         """Pop the first task from the buffer."""
         if self.buffer:
             task = self.buffer.popleft()
-            self.task_ids.remove(task.task_id)
             self.free_size += task.task_size
             return task
         return None
@@ -136,7 +162,6 @@ class Buffer(object):
     def reset(self):
         """Reset the buffer to its initial state."""
         self.buffer.clear()
-        self.task_ids.clear()
         self.free_size = self.max_size
 
 
@@ -162,11 +187,16 @@ class Node(object):
         location: The geographical location of the node.
         idle_energy_coef: Energy consumption coefficient during idle state.
         exe_energy_coef: Energy consumption coefficient during working/computing state.
-        active_tasks: List of active tasks on the node.
+        active_tasks: Snapshot of the active tasks on the node, in order of arrival.
+        active_task_ids: Snapshot of the IDs of the active tasks, in order of arrival.
         energy_consumption: The total energy consumption..
         flag_only_wireless: Whether the node only supports wireless transmission.
     """
 
+    __slots__ = ("node_id", "name", "max_cpu_freq", "state", "_free_cpu_freq", "task_buffer", 
+                 "location", "energy_consumption", "idle_energy_coef", "exe_energy_coef", 
+                 "_active_tasks", "flag_only_wireless", "total_cpu_freq", "clock")
+
     def __init__(self, node_id: int, name: str, max_cpu_freq: float, 
                  max_buffer_size: Optional[int] = 0, location: Optional[Location] = None,
                  idle_energy_coef: Optional[float] = 0, exe_energy_coef: Optional[float] = 0):
@@ -174,6 +204,9 @@ class Node(object):
         self.node_id = node_id
         self.name = name
         self.max_cpu_freq = max_cpu_freq
+
+        # Mirror of free_cpu_freq in the infrastructure state arrays, set by InfrastructureState
+        self.state: Optional["InfrastructureState"] = None
         self.free_cpu_freq = max_cpu_freq
 
         # Buffer for tasks
@@ -185,9 +218,8 @@ class Node(object):
         self.idle_energy_coef = idle_energy_coef
         self.exe_energy_coef = exe_energy_coef
         
-        # Track active tasks and task IDs
-        self.active_tasks: List["Task"] = []
-        self.active_task_ids = []
+        # Track active tasks, in order of arrival (an insertion-ordered dict, for O(1) removal)
+        self._active_tasks: Dict["Task", None] = {}
 
         # Wireless flag and other system variables
         self.flag_only_wireless = False
@@ -198,6 +230,28 @@ class Node(object):
         """Returns a string representation of the node."""
         return f"{self.name} ({self.free_cpu_freq}/{self.max_cpu_freq})"
 
+    @property
+    def free_cpu_freq(self):
+        """The current available CPU frequency."""
+        return self._free_cpu_freq
+
+    @free_cpu_freq.setter
+    def free_cpu_freq(self, value):
+        self._free_cpu_freq = value
+        if self.state is not None:
+            self.state.free_cpu_freq[self.node_id] = value
+            self.state.mark_node(self.node_id)
+
+    @property
+    def active_tasks(self) -> List["Task"]:
+        """Snapshot of the active tasks on the node, in order of arrival."""
+        return list(self._active_tasks)
+
+    @property
+    def active_task_ids(self) -> List[int]:
+        """Snapshot of the IDs of the active tasks, in order of arrival."""
+        return [task.task_id for task in self._active_tasks]
+
     def buffer_free_size(self, val=None):
         """Obtain or modify the buffer's free size."""
         if val is None:
@@ -276,14 +330,12 @@ class Node(object):
     def add_task(self, task: "Task"):
         """Add a task to the node."""
         self._reserve_resource(task)
-        self.active_tasks.append(task)
-        self.active_task_ids.append(task.task_id)
+        self._active_tasks[task] = None
 
     def remove_task(self, task: "Task"):
         """Remove a task from the node."""
         self._release_resource(task)
-        self.active_tasks.remove(task)
-        self.active_task_ids.remove(task.task_id)
+        del self._active_tasks[task]
 
     def _reserve_resource(self, task: "Task"):
         """Reserve CPU resources for the task."""
@@ -305,8 +357,9 @@ class Node(object):
         self.free_cpu_freq = self.max_cpu_freq
         self.task_buffer.reset()
         self.energy_consumption = 0
-        self.active_tasks.clear()
-        self.active_task_ids.clear()
+        self.total_cpu_freq = 0
+        self.clock = 0
+        self._active_tasks.clear()
 
 
 class Link(object):
@@ -322,6 +375,9 @@ class Link(object):
         data_flows: List of data flows allocated on this link.
     """
 
+    __slots__ = ("src", "dst", "max_bandwidth", "base_latency", "dis", "state", "link_idx", 
+                 "_free_bandwidth", "data_flows", "energy_coef")
+
     def __init__(self, src: Node, dst: Node, max_bandwidth: float, base_latency: Optional[float] = 0, energy_coef: Optional[float] = 0):
         """Initializes a network link with source and destination nodes."""
         # Check if either node is wireless, which is not allowed for links.
@@ -336,6 +392,10 @@ class Link(object):
             self.dis = self._calculate_distance()
         except AttributeError:
             self.dis = 1
+
+        # Mirror of free_bandwidth in the infrastructure state arrays, set by InfrastructureState
+        self.state: Optional["InfrastructureState"] = None
+        self.link_idx = None
         self.free_bandwidth = max_bandwidth
         self.data_flows: List["DataFlow"] = []
         self.energy_coef = energy_coef
@@ -344,6 +404,18 @@ class Link(object):
         """Returns a string representation of the link."""
         return f"{self.src.name} --> {self.dst.name} ({self.free_bandwidth}/{self.max_bandwidth}) ({self.base_latency})"
 
+    @property
+    def free_bandwidth(self):
+        """The current available bandwidth in bps."""
+        return self._free_bandwidth
+
+    @free_bandwidth.setter
+    def free_bandwidth(self, value):
+        self._free_bandwidth = value
+        if self.state is not None:
+            self.state.free_bandwidth[self.link_idx] = value
+            self.state.mark_link(self.link_idx)
+
     def status(self):
         """User-defined Link status (deprecated)."""
         warnings.warn("Deprecated. Define it in :class: Scenario instead.", DeprecationWarning)
@@ -387,6 +459,139 @@ class Link(object):
         self.data_flows.clear()
 
 
+class InfrastructureState(object):
+    """Contiguous arrays mirroring the dynamic state of the infrastructure.
+
+    Nodes, buffers and links write their new value into these arrays whenever it changes,
+    so that observations can be built from array slices instead of per-object lookups.
+    Every write also stamps the row with a new version number, so that consumers can 
+    refresh only the rows that changed since they last looked.
+
+    Attributes:
+        free_cpu_freq: Free CPU frequency of each node, indexed by node_id.
+        buffer_free_size: Free buffer size of each node, indexed by node_id.
+        free_bandwidth: Free bandwidth of each link, indexed by link_idx, i.e., 
+            the order of :meth:`Infrastructure.get_links`.
+        version: Number of writes so far.
+        node_version: Version of the last write to each node row.
+        link_version: Version of the last write to each link row.
+    """
+
+    def __init__(self, nodes: List[Node], links: List[Link]):
+        """Allocate the arrays and attach the nodes and links to them."""
+        n_nodes = max((node.node_id for node in nodes), default=-1) + 1
+        self.free_cpu_freq = np.zeros(n_nodes)
+        self.buffer_free_size = np.zeros(n_nodes)
+        self.free_bandwidth = np.zeros(len(links))
+        self.version = 0
+        self.node_version = np.zeros(n_nodes, dtype=np.int64)
+        self.link_version = np.zeros(len(links), dtype=np.int64)
+
+        for node in nodes:
+            node.state = self
+            node.task_buffer.state = self
+            node.task_buffer.state_idx = node.node_id
+            self.free_cpu_freq[node.node_id] = node.free_cpu_freq
+            self.buffer_free_size[node.node_id] = node.task_buffer.free_size
+
+        for link_idx, link in enumerate(links):
+            link.state = self
+            link.link_idx = link_idx
+            self.free_bandwidth[link_idx] = link.free_bandwidth
+
+    def mark_node(self, node_id: int):
+        """Record that the row of a node has changed."""
+        self.version += 1
+        self.node_version[node_id] = self.version
+
+    def mark_link(self, link_idx: int):
+        """Record that the row of a link has changed."""
+        self.version += 1
+        self.link_version[link_idx] = self.version
+
+
+class BottleneckBandwidth(object):
+    """Bottleneck free bandwidth on the shortest path between each pair of nodes.
+
+    The matrix is maintained incrementally: a change in the free bandwidth of a link (i.e., 
+    a link touched by DataFlow.allocate or DataFlow.deallocate) only invalidates the rows of 
+    the source nodes whose paths cross that link, and an invalid row is recomputed the next 
+    time it is read. The diagonal holds the largest free bandwidth over all links and 
+    unreachable pairs hold 0.
+
+    Attributes:
+        matrix: Array of shape (n_nodes, n_nodes) indexed by node_id.
+    """
+
+    def __init__(self, infrastructure: "Infrastructure", weight: Optional[str] = None):
+        """Index the links on the shortest path between each pair of nodes."""
+        self.state = infrastructure.get_state()
+        nodes = list(infrastructure.get_nodes().values())
+        n_nodes = len(self.state.free_cpu_freq)
+        n_links = len(self.state.free_bandwidth)
+
+        # Free bandwidth of each link, followed by a +inf padding slot and a 0 "no path" slot
+        self._bw = np.append(self.state.free_bandwidth, [np.inf, 0])
+        pad, no_path = n_links, n_links + 1
+
+        paths = {}
+        link_sources = [set() for _ in range(n_links)]
+        for src in nodes:
+            for dst in nodes:
+                if src is dst:
+                    continue
+                try:
+                    links = infrastructure.get_shortest_links(src.name, dst.name, weight)
+                except (nx.exception.NetworkXNoPath, EnvironmentError):
+                    paths[src.node_id, dst.node_id] = [no_path]
+                    continue
+                # wireless hops are (src_name, dst_name) tuples without bandwidth
+                path = [link.link_idx for link in links if not isinstance(link, tuple)]
+                paths[src.node_id, dst.node_id] = path
+                for link_idx in path:
+                    link_sources[link_idx].add(src.node_id)
+
+        max_hops = max((len(path) for path in paths.values()), default=1)
+        self._path_links = np.full((n_nodes, n_nodes, max(max_hops, 1)), pad, dtype=np.int64)
+        for (src_id, dst_id), path in paths.items():
+            self._path_links[src_id, dst_id, :len(path)] = path
+        self._link_sources = [np.fromiter(sources, dtype=np.int64, count=len(sources))
+                              for sources in link_sources]
+
+        self.matrix = np.zeros((n_nodes, n_nodes))
+        self._dirty = np.ones(n_nodes, dtype=bool)
+        self._max_bw = self._bw[:-2].max(initial=0)
+        self._version = self.state.version
+
+    def update(self):
+        """Invalidate the rows crossing a link whose free bandwidth changed since the last update."""
+        state = self.state
+        if state.version == self._version:
+            return
+        links = np.flatnonzero(state.link_version > self._version)
+        self._version = state.version
+        if not len(links):
+            return
+        self._bw[links] = state.free_bandwidth[links]
+        self._max_bw = self._bw[:-2].max(initial=0)
+        for link_idx in links:
+            self._dirty[self._link_sources[link_idx]] = True
+
+    def from_node(self, node_id: int) -> np.ndarray:
+        """Return the bottleneck free bandwidth from a node to every node, indexed by node_id.
+
+        The returned row is a view on the matrix and is overwritten by later reads.
+        """
+        self.update()
+        row = self.matrix[node_id]
+        if self._dirty[node_id]:
+            np.min(self._bw[self._path_links[node_id]], axis=1, out=row)
+            row[np.isinf(row)] = 0
+            self._dirty[node_id] = False
+        row[node_id] = self._max_bw
+        return row
+
+
 class Infrastructure(object):
     """Class representing the infrastructure network with nodes and links.
 
@@ -398,6 +603,25 @@ class Infrastructure(object):
     def __init__(self):
         """Initializes the infrastructure with an empty directed graph."""
         self.graph = nx.MultiDiGraph()
+        # Routing table: (src_name, dst_name, weight) -> links in the shortest path, 
+        # or None if dst is unreachable from src. Invalidated on any topology change.
+        self.routing_table: Dict[Tuple[str, str, Optional[str]], Optional[List[Link]]] = {}
+        # Cached views of the graph, rebuilt lazily after a topology change
+        self._nodes: Optional[Dict[str, Node]] = None
+        self._links: Optional[Dict[tuple, Link]] = None
+        self._state: Optional[InfrastructureState] = None
+        self._bottlenecks: Dict[Optional[str], BottleneckBandwidth] = {}
+        # Compiled routing table (hops, link indices, links) for weight None, see set_compiled_routes
+        self._compiled_routes: Optional[Tuple[np.ndarray, np.ndarray, List[Link]]] = None
+
+    def _topology_changed(self):
+        """Invalidate everything derived from the graph structure."""
+        self.routing_table.clear()
+        self._compiled_routes = None
+        self._nodes = None
+        self._links = None
+        self._state = None
+        self._bottlenecks.clear()
 
     def add_node(self, node: Node):
         """Add a node to the infrastructure.
@@ -410,11 +634,13 @@ class Infrastructure(object):
             if node.location:
                 node_data['pos'] = list(node.location.loc())
             self.graph.add_node(node.name, **node_data)
+            self._topology_changed()
 
     def remove_node(self, name: str):
         """Remove a node and all its adjacent edges from the infrastructure by node name."""
         if name in self.graph:
             self.graph.remove_node(name)
+            self._topology_changed()
 
     def add_link(self, link: Link, key=None):
         """Add a link between two nodes, automatically adding nodes if missing.
@@ -430,6 +656,7 @@ class Infrastructure(object):
         # get_shortest_path/links
         self.graph.add_edge(link.src.name, link.dst.name, key=key, data=link,
                             dis=link.dis, latency=link.base_latency, energy_coef=link.energy_coef)
+        self._topology_changed()
 
     def remove_link(self, src_name: str, dst_name: str, key=None):
         """Remove a specific link between two nodes identified by their names.
@@ -444,10 +671,11 @@ class Infrastructure(object):
                  Used to distinguish multi-edges between a pair of nodes.
         """
         self.graph.remove_edge(src_name, dst_name, key=key)
+        self._topology_changed()
 
     def get_node(self, name: str) -> Node:
         """Retrieve a specific node by its name."""
-        return self.graph.nodes[name]["data"]
+        return self.get_nodes()[name]
 
     def get_link(self, src_name: str, dst_name: str, key=0) -> Link:
         """Retrieve a specific link by the source and destination node names."""
@@ -455,22 +683,45 @@ class Infrastructure(object):
         return self.graph.edges[src_name, dst_name, key]["data"]
 
     def get_nodes(self) -> Dict[str, Node]:
-        """Retrieve all nodes in the infrastructure as a dictionary of node names to nodes."""
+        """Retrieve all nodes in the infrastructure as a dictionary of node names to nodes.
+
+        The dictionary is cached until the topology changes and must not be modified.
+        """
         # # v1: return as a list
         # nodes: Iterator[Node] = (v for _, v in self.graph.nodes.data("data"))
         # return list(nodes)
         # --------------------
         # v2: return as a dict
-        return dict(nx.get_node_attributes(self.graph, 'data'))
+        if self._nodes is None:
+            self._nodes = dict(nx.get_node_attributes(self.graph, 'data'))
+        return self._nodes
 
     def get_links(self) -> Dict[str, Link]:
-        """Retrieve all links in the infrastructure as a dictionary of edge keys to links."""
+        """Retrieve all links in the infrastructure as a dictionary of edge keys to links.
+
+        The dictionary is cached until the topology changes and must not be modified.
+        """
         # # v1: return as a list
         # links: Iterator[Link] = (v for _, _, v in self.graph.edges.data("data"))
         # return list(links)
         # --------------------
         # v2: return as a dict
-        return nx.get_edge_attributes(self.graph, 'data')
+        if self._links is None:
+            self._links = nx.get_edge_attributes(self.graph, 'data')
+        return self._links
+
+    def get_state(self) -> InfrastructureState:
+        """Retrieve the array-backed state of the nodes and links, kept up to date in place."""
+        if self._state is None:
+            self._state = InfrastructureState(list(self.get_nodes().values()), 
+                                              list(self.get_links().values()))
+        return self._state
+
+    def get_bottleneck_bandwidth(self, weight: Optional[str] = None) -> BottleneckBandwidth:
+        """Retrieve the bottleneck free bandwidth between all pairs of nodes, kept up to date lazily."""
+        if weight not in self._bottlenecks:
+            self._bottlenecks[weight] = BottleneckBandwidth(self, weight)
+        return self._bottlenecks[weight]
 
     def get_shortest_path(self, src_name: str, dst_name: str, weight=None):
         """Retrieve the shortest path between two nodes based on the provided weight."""
@@ -523,10 +774,53 @@ class Infrastructure(object):
         return shortest_links
 
     def _get_standard_shortest_links(self, src_name: str, dst_name: str, weight: Optional[str] = None):
-        """Retrieve the standard shortest links between two nodes."""
-        shortest_path = nx.shortest_path(self.graph, src_name, dst_name, weight=weight)
-        return [self.graph.edges[a, b, 0]["data"]
-                for a, b in nx.utils.pairwise(shortest_path)]
+        """Retrieve the standard shortest links between two nodes from the routing table.
+
+        The returned list is shared by all callers and must not be modified.
+        """
+        key = (src_name, dst_name, weight)
+        try:
+            links = self.routing_table[key]
+        except KeyError:
+            links = self._route(src_name, dst_name, weight)
+        if links is None:
+            raise nx.exception.NetworkXNoPath(f"No path between {src_name} and {dst_name}.")
+        return links
+
+    def set_compiled_routes(self, route_hops: np.ndarray, route_links: np.ndarray, links: List[Link]):
+        """
+        Provide the shortest links between all pairs of nodes (for weight None), compiled in arrays 
+        indexed by node ids: the path from node i to node j is [links[k] for k in 
+        route_links[i, j, :route_hops[i, j]]], or None if route_hops[i, j] is negative. 
+        The routing table is then filled from these arrays instead of searching the graph, 
+        until the topology changes.
+        """
+        self._compiled_routes = (route_hops, route_links, links)
+
+    def _route(self, src_name: str, dst_name: str, weight: Optional[str] = None) -> Optional[List[Link]]:
+        """Search the shortest links between two nodes and store them in the routing table."""
+        if weight is None and self._compiled_routes is not None:
+            route_hops, route_links, links = self._compiled_routes
+            src_id, dst_id = self.get_node(src_name).node_id, self.get_node(dst_name).node_id
+            hops = int(route_hops[src_id, dst_id])
+            path = None if hops < 0 else [links[k] for k in route_links[src_id, dst_id, :hops].tolist()]
+            self.routing_table[(src_name, dst_name, weight)] = path
+            return path
+        try:
+            shortest_path = nx.shortest_path(self.graph, src_name, dst_name, weight=weight)
+            links = [self.graph.edges[a, b, 0]["data"]
+                     for a, b in nx.utils.pairwise(shortest_path)]
+        except nx.exception.NetworkXNoPath:
+            links = None
+        self.routing_table[(src_name, dst_name, weight)] = links
+        return links
+
+    def build_routing_table(self, weight: Optional[str] = None):
+        """Precompute the shortest links between all pairs of nodes for the given weight."""
+        for src_name in self.graph.nodes:
+            for dst_name in self.graph.nodes:
+                if (src_name, dst_name, weight) not in self.routing_table:
+                    self._route(src_name, dst_name, weight)
 
     def get_longest_shortest_path(self) -> int:
         """Return the longest shortest path length among all pairs of nodes in the infrastructure."""
@@ -0,0 +1,110 @@
+import heapq
+from typing import Callable, Sequence
+
+__all__ = ["EventKernel", "ProcessKernel", "URGENT", "NORMAL"]
+
+# Event priorities, ordered as simpy's: process starts (URGENT) before timeouts (NORMAL) at the same time
+URGENT, NORMAL = 0, 1
+
+
+class EventKernel:
+    """Minimal discrete-event kernel: a binary heap of typed events, without generators.
+
+    An event is a (time, priority, sequence number, kind, args) entry of the heap; when it is
+    popped, the kernel advances the clock to its time and calls ``handlers[kind](*args)``, which
+    may schedule further events. Events are ordered by time, then priority, then scheduling
+    order, as in simpy, so that a model ported from simpy processes to handlers runs its events
+    in the same order.
+
+    It keeps the part of the simpy.Environment API the simulation relies on: ``now`` and
+    ``run(until)``.
+
+    :class:`Env` runs its task processes on it through :class:`ProcessKernel` when created with
+    ``controller="kernel"``.
+
+    Attributes:
+        handlers: The event handlers, indexed by event kind.
+        processed: Number of events handled so far.
+    """
+
+    def __init__(self, handlers: Sequence[Callable], initial_time: float = 0.0):
+        self.handlers = list(handlers)
+        self.processed = 0
+        self._now = initial_time
+        self._events: list = []
+        self._seq = 0
+
+    @property
+    def now(self) -> float:
+        """Get the current simulation time."""
+        return self._now
+
+    def __len__(self) -> int:
+        """Get the number of pending events."""
+        return len(self._events)
+
+    def peek(self) -> float:
+        """Get the time of the next pending event, or inf if there is none."""
+        return self._events[0][0] if self._events else float('inf')
+
+    def schedule(self, time: float, priority: int, kind: int, *args):
+        """Schedule an event of the given kind at an absolute time (not before now)."""
+        heapq.heappush(self._events, (time, priority, self._seq, kind, args))
+        self._seq += 1
+
+    def run(self, until: float):
+        """Handle the events until the specified time.
+
+        As with simpy's stop event, the urgent events at `until` scheduled before this call are
+        handled, and the normal ones are left pending.
+        """
+        if until <= self._now:
+            raise ValueError(f"until(={until}) must be > the current simulation time.")
+        stop_seq = self._seq
+        self._seq += 1
+        events, handlers, heappop = self._events, self.handlers, heapq.heappop
+        processed = 0
+        while events:
+            time, priority, seq, kind, args = events[0]
+            # Same as (time, priority, seq) < (until, URGENT, stop_seq), without building tuples
+            if time > until or (time == until and (priority > URGENT or seq > stop_seq)):
+                break
+            heappop(events)
+            self._now = time
+            handlers[kind](*args)
+            processed += 1
+        self.processed += processed
+        self._now = until
+
+
+class ProcessKernel(EventKernel):
+    """EventKernel running simpy-style generator processes, as a drop-in controller of :class:`Env`.
+
+    It keeps the part of the simpy.Environment API the processes of :class:`Env` rely on:
+    ``process(generator)`` and ``yield timeout(delay)``. A process is stepped by a single event
+    kind, without the Process, Initialize and Timeout event objects of simpy: its start is an
+    urgent event at the current time, and each timeout a normal event, scheduled when the
+    process yields it (right after creating it in simpy), so that the events run in the same
+    order as with simpy. Interrupts and the other simpy events are not supported.
+    """
+
+    def __init__(self, initial_time: float = 0.0):
+        super().__init__([self._step], initial_time)
+
+    def process(self, generator):
+        """Start a process at the current time."""
+        self.schedule(self._now, URGENT, 0, generator)
+        return generator
+
+    @staticmethod
+    def timeout(delay: float) -> float:
+        """Return the event a process yields to wait for `delay`."""
+        return delay
+
+    def _step(self, generator):
+        """Resume a process until its next timeout, which is then scheduled."""
+        try:
+            delay = next(generator)
+        except StopIteration:
+            return
+        self.schedule(self._now + delay, NORMAL, 0, generator)
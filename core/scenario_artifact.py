@@ -0,0 +1,125 @@
+"""
+Compiled scenario artifacts.
+
+A scenario compiled from its config.json is stored next to it, as ``config.scenario.npz``:
+node attributes, link attributes (in creation order), a CSR adjacency of the links and the
+precomputed routing table and path matrices. :class:`BaseScenario` loads the artifact instead
+of rebuilding the scenario whenever the artifact is newer than the config.json.
+
+The arrays are stored uncompressed, so that they can be memory-mapped: the worker processes
+loading the same artifact share a single copy of the routing arrays.
+
+Usage (compile the artifacts in advance, e.g., before starting parallel workers):
+    python core/scenario_artifact.py eval/benchmarks/Topo4MEC/data/100N150E/config.json
+"""
+
+import os
+import struct
+import zipfile
+from typing import Dict, Optional
+
+import numpy as np
+
+__all__ = ["ARTIFACT_VERSION", "artifact_path", "save_artifact", "load_artifact"]
+
+# Bump when the content of the artifacts changes, to invalidate the existing ones
+ARTIFACT_VERSION = 1
+
+
+def artifact_path(config_file: str) -> str:
+    """Return the path of the artifact of a config.json."""
+    return os.path.splitext(config_file)[0] + ".scenario.npz"
+
+
+def save_artifact(path: str, arrays: Dict[str, np.ndarray]) -> bool:
+    """Save the compiled arrays, through a temporary file. Return whether it succeeded."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            np.savez(file, artifact_version=ARTIFACT_VERSION, **arrays)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def load_artifact(path: str, source_path: Optional[str] = None,
+                  mmap: bool = True) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Load the compiled arrays.
+
+    Args:
+        path: The artifact.
+        source_path: The config.json it was compiled from; the artifact is ignored if older.
+        mmap: Whether to memory-map the arrays (read-only) instead of reading them.
+
+    Returns:
+        The arrays, or None if the artifact is missing, stale or of another version.
+    """
+    try:
+        if source_path is not None and os.stat(path).st_mtime_ns < os.stat(source_path).st_mtime_ns:
+            return None
+        if mmap:
+            arrays = _memmap_npz(path)
+        else:
+            with np.load(path) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+    if int(arrays.pop('artifact_version', -1)) != ARTIFACT_VERSION:
+        return None
+    return arrays
+
+
+def _memmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """Memory-map the arrays of an uncompressed npz file."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} is compressed and cannot be memory-mapped.")
+            # The local header may have another extra field than the central directory
+            file.seek(info.header_offset)
+            name_len, extra_len = struct.unpack('<HH', file.read(30)[26:30])
+            file.seek(info.header_offset + 30 + name_len + extra_len)
+
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            if dtype.hasobject:
+                raise ValueError(f"{info.filename} holds Python objects.")
+
+            name = info.filename[:-len('.npy')]
+            if len(shape) == 0 or 0 in shape:
+                arrays[name] = np.fromfile(file, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=file.tell(),
+                                         shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.base_scenario import BaseScenario
+
+    class _Scenario(BaseScenario):
+        def status(self):
+            pass
+
+    parser = argparse.ArgumentParser(description="Compile scenario config.json files into artifacts.")
+    parser.add_argument("config_files", nargs="+", help="The config.json files to compile.")
+    args = parser.parse_args()
+
+    for config_file in args.config_files:
+        scenario = _Scenario(config_file, use_artifact=False)
+        path = artifact_path(config_file)
+        if not save_artifact(path, scenario.compile()):
+            raise SystemExit(f"Cannot write {path}.")
+        print(f"{config_file} -> {path}")
@@ -1,9 +1,9 @@
 import math
-from typing import Optional
+from typing import List, Optional
 
 from core.infrastructure import Node, Data, DataFlow, Link
 
-__all__ = ["Task"]
+__all__ = ["Task", "TaskPool"]
 
 
 class Task:
@@ -30,9 +30,21 @@ class Task:
         exe_cnt: Counter for task execution times.
     """
 
+    __slots__ = ("task_id", "task_size", "cycles_per_bit", "trans_bit_rate", "ddl", "cpu_freq", 
+                 "_task_data", "_trans_flow", "trans_time", "wait_time", "exe_time", 
+                 "exe_energy", "trans_energy", "src_name", "dst", "dst_id", "dst_name", 
+                 "task_name", "exe_cnt")
+
     def __init__(self, task_id: int, task_size: int, cycles_per_bit: int, trans_bit_rate: int,
                  src_name: str, ddl: Optional[int] = -1, task_name: Optional[str] = ""):
         """Initialize the Task object."""
+        self._task_data: Optional[Data] = None
+        self._trans_flow: Optional[DataFlow] = None
+        self.reinit(task_id, task_size, cycles_per_bit, trans_bit_rate, src_name, ddl, task_name)
+
+    def reinit(self, task_id: int, task_size: int, cycles_per_bit: int, trans_bit_rate: int,
+               src_name: str, ddl: Optional[int] = -1, task_name: Optional[str] = "") -> "Task":
+        """(Re-)initialize the task attributes, e.g., when the task is reused by a :class:`TaskPool`."""
         self.task_id = task_id
         self.task_size = task_size
         self.cycles_per_bit = cycles_per_bit
@@ -41,9 +53,11 @@ class Task:
 
         self.cpu_freq = -1  # Placeholder for the CPU frequency during execution
 
-        # Task data and flow
-        self.task_data = Data(task_size)
-        self.trans_flow = DataFlow(trans_bit_rate)
+        # Task data and flow objects are created on first use and reused afterwards
+        if self._task_data is not None:
+            self._task_data.data_size = task_size
+        if self._trans_flow is not None:
+            self._trans_flow.bit_rate = trans_bit_rate
 
         self.trans_time = -1
         self.wait_time = -1
@@ -59,6 +73,21 @@ class Task:
 
         self.task_name = task_name
         self.exe_cnt = 0
+        return self
+
+    @property
+    def task_data(self) -> Data:
+        """Task data object to be processed."""
+        if self._task_data is None:
+            self._task_data = Data(self.task_size)
+        return self._task_data
+
+    @property
+    def trans_flow(self) -> DataFlow:
+        """Data flow object associated with the task."""
+        if self._trans_flow is None:
+            self._trans_flow = DataFlow(self.trans_bit_rate)
+        return self._trans_flow
 
     def __repr__(self) -> str:
         """Return a string representation of the task."""
@@ -120,3 +149,44 @@ class Task:
         self.dst_name = None
 
         self.exe_cnt += 1
+
+
+class TaskPool(object):
+    """A free list of finished :class:`Task` objects, reused for new tasks.
+
+    An environment with a pool releases each task into it once the task is done (completed
+    or failed), so that long traces and successive epochs recycle a bounded number of task
+    objects instead of allocating one per task. A released task must not be used anymore
+    by the caller; in particular, the tasks of :attr:`Env.active_tasks` are never released.
+
+    Attributes:
+        max_size: Maximum number of idle tasks kept in the pool.
+    """
+
+    __slots__ = ("max_size", "_free")
+
+    def __init__(self, max_size: int = 65536):
+        self.max_size = max_size
+        self._free: List[Task] = []
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(self, task_id: int, task_size: int, cycles_per_bit: int, trans_bit_rate: int,
+                src_name: str, ddl: Optional[int] = -1, task_name: Optional[str] = "") -> Task:
+        """Return a task with the given attributes, reusing an idle one if possible."""
+        if self._free:
+            return self._free.pop().reinit(task_id, task_size, cycles_per_bit, trans_bit_rate,
+                                           src_name, ddl, task_name)
+        return Task(task_id, task_size, cycles_per_bit, trans_bit_rate, src_name, ddl, task_name)
+
+    def release(self, task: Task) -> None:
+        """Return a finished task to the pool."""
+        if task._trans_flow is not None and task._trans_flow.links is not None:
+            raise ValueError(f"Cannot release {task}: It is still transmitted on {task._trans_flow.links}.")
+        if len(self._free) < self.max_size:
+            self._free.append(task)
+
+    def clear(self) -> None:
+        """Drop the idle tasks."""
+        self._free.clear()
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import zipfile
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from core.task import Task, TaskPool
+
+__all__ = ["TaskRecord", "TaskTable"]
+
+
+class TaskRecord(NamedTuple):
+    """A lightweight row of a :class:`TaskTable`."""
+    generation_time: float
+    task_id: int
+    task_size: int
+    cycles_per_bit: float
+    trans_bit_rate: float
+    ddl: float
+    src_name: str
+    task_name: str
+
+    def to_task(self, pool: Optional[TaskPool] = None) -> Task:
+        """Create the task described by the record, reusing a finished task of the pool if given."""
+        if pool is not None:
+            return pool.acquire(self.task_id, self.task_size, self.cycles_per_bit, self.trans_bit_rate,
+                                self.src_name, self.ddl, self.task_name)
+        return Task(task_id=self.task_id,
+                    task_size=self.task_size,
+                    cycles_per_bit=self.cycles_per_bit,
+                    trans_bit_rate=self.trans_bit_rate,
+                    ddl=self.ddl,
+                    src_name=self.src_name,
+                    task_name=self.task_name)
+
+
+class TaskTable(object):
+    """A task trace decoded once into typed NumPy columns.
+
+    The CSV columns (TaskName, GenerationTime, TaskID, TaskSize, CyclesPerBit, TransBitRate,
+    DDL and optionally SrcName) are decoded in :meth:`from_csv`, which also handles the source
+    node default and the deadline scaling. Decoded traces are cached in memory and in a
+    ``<name>.tasktable.npz`` file next to the CSV, which is reused (e.g., by worker processes)
+    as long as it is newer than the CSV.
+
+    Iterating over a table yields :class:`TaskRecord` tuples, without pandas in the loop.
+    """
+
+    COLUMNS = {
+        'generation_time': 'GenerationTime',
+        'task_id': 'TaskID',
+        'task_size': 'TaskSize',
+        'cycles_per_bit': 'CyclesPerBit',
+        'trans_bit_rate': 'TransBitRate',
+        'ddl': 'DDL',
+        'src_name': 'SrcName',
+        'task_name': 'TaskName',
+    }
+
+    _cache: Dict[Tuple[str, int, str], Dict[str, np.ndarray]] = {}  # (path, mtime, default src) -> columns
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self._records: Optional[List[TaskRecord]] = None
+
+    @staticmethod
+    def _decode(data, default_src_name: str) -> Dict[str, np.ndarray]:
+        """Decode the raw columns of a DataFrame."""
+        columns = {}
+        for name, csv_name in TaskTable.COLUMNS.items():
+            if csv_name in data:
+                columns[name] = data[csv_name].to_numpy()
+        if 'src_name' not in columns:
+            columns['src_name'] = np.full(len(data), default_src_name)
+        for name in ('src_name', 'task_name'):
+            columns[name] = columns[name].astype(str)
+        return columns
+
+    @classmethod
+    def from_dataframe(cls, data, ddl_divisor: float = 1, default_src_name: str = 'e0') -> "TaskTable":
+        """Decode a pandas DataFrame with the CSV columns.
+
+        Args:
+            data: The DataFrame.
+            ddl_divisor: The deadlines are divided by this value.
+            default_src_name: The source node of the tasks if there is no SrcName column.
+        """
+        return cls._scaled(cls._decode(data, default_src_name), ddl_divisor)
+
+    @classmethod
+    def from_csv(cls, path: str, ddl_divisor: float = 1, default_src_name: str = 'e0') -> "TaskTable":
+        """Load a CSV task trace, from the cache if possible.
+
+        Args:
+            path: The CSV file.
+            ddl_divisor: The deadlines are divided by this value.
+            default_src_name: The source node of the tasks if there is no SrcName column.
+        """
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, mtime, default_src_name)
+        columns = cls._cache.get(key)
+        if columns is None:
+            cache_path = os.path.splitext(path)[0] + ".tasktable.npz"
+            columns = cls._load_npz(cache_path, mtime, default_src_name)
+            if columns is None:
+                import pandas as pd
+                columns = cls._decode(pd.read_csv(path), default_src_name)
+                cls._save_npz(cache_path, columns, default_src_name)
+            cls._cache[key] = columns
+        return cls._scaled(columns, ddl_divisor)
+
+    @staticmethod
+    def _load_npz(cache_path: str, mtime: int, default_src_name: str) -> Optional[Dict[str, np.ndarray]]:
+        """Load the decoded columns from the cache file if it is newer than the CSV."""
+        try:
+            if os.stat(cache_path).st_mtime_ns < mtime:
+                return None
+            with np.load(cache_path) as npz:
+                if str(npz['default_src_name']) != default_src_name:
+                    return None
+                return {name: npz[name] for name in TaskTable.COLUMNS}
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            return None
+
+    @staticmethod
+    def _save_npz(cache_path: str, columns: Dict[str, np.ndarray], default_src_name: str) -> None:
+        """Save the decoded columns to the cache file, through a temporary file, if the directory is writable."""
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                np.savez(file, default_src_name=default_src_name, **columns)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def _scaled(cls, columns: Dict[str, np.ndarray], ddl_divisor: float) -> "TaskTable":
+        """Create a table from decoded columns, scaling the deadlines."""
+        columns = dict(columns)
+        if ddl_divisor != 1:
+            columns['ddl'] = columns['ddl'] / ddl_divisor
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return len(self.columns['task_id'])
+
+    def __getitem__(self, index: slice) -> "TaskTable":
+        """Return the tasks in a slice of rows, sharing the columns."""
+        if not isinstance(index, slice):
+            raise TypeError("TaskTable only supports slicing; iterate over it to get records.")
+        return TaskTable({name: column[index] for name, column in self.columns.items()})
+
+    def normalize_time(self) -> "TaskTable":
+        """Return a copy whose generation times start at 0."""
+        columns = dict(self.columns)
+        times = columns['generation_time']
+        columns['generation_time'] = times - times.min() if len(times) else times
+        return TaskTable(columns)
+
+    def fingerprint(self) -> str:
+        """Return a digest of the content of the table, e.g., to key results computed on it."""
+        digest = hashlib.sha1()
+        for name in sorted(self.columns):
+            column = np.ascontiguousarray(self.columns[name])
+            digest.update(f"{name}:{column.dtype.str}:{column.shape};".encode())
+            digest.update(column.tobytes())
+        return digest.hexdigest()
+
+    def records(self) -> List[TaskRecord]:
+        """Return the rows as records of Python values, built once."""
+        if self._records is None:
+            self._records = list(map(TaskRecord._make, zip(
+                *(self.columns[name].tolist() for name in TaskRecord._fields))))
+        return self._records
+
+    def __iter__(self) -> Iterator[TaskRecord]:
+        return iter(self.records())
+
+    def __getstate__(self):
+        # Send only the columns to worker processes; the records are rebuilt on demand
+        return {'columns': self.columns, '_records': None}
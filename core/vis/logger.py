@@ -127,14 +127,22 @@ class Logger:
         is None, an empty string is stored instead. The logged value is stored internally,
         written to the log file, printed, and appended as a row for CSV export (immediately).
 
+        A dict of values (e.g., the percentiles of eval.metrics.streaming.StreamingMetrics.quantiles)
+        is logged under the metric names <metric><key>, e.g., <metric>P50.
+
         Args:
             metric (str): The metric name.
-            value (float): The metric value.
+            value (float or dict): The metric value, or the values by name suffix.
         """
         
         if metric is None or value is None:
             return
         
+        if isinstance(value, dict):
+            for key, item in value.items():
+                self.update_metric(f"{metric}{key}", item)
+            return
+        
         # Use empty string if current_epoch or current_mode is not set.
         epoch_val = self.current_epoch if self.current_epoch is not None else ""
         mode_val = self.current_mode if self.current_mode is not None else ""
@@ -15,11 +15,8 @@ class SuccessRate(object):
         
         info = logger.task_info
         
-        n = 0
+        n = info.n_success
         m = len(info)
-        for _, val in info.items():
-            if val[0] == 0:
-                n += 1
         return (1 - n / m) if m > 0 else 0.0
 
 
@@ -34,22 +31,12 @@ class AvgLatency(object):
 
     def eval(self, logger, eps=1e-6) -> float:
         
-        latencies = []
         info = logger.task_info
-        
-        statue_code_idx = logger.get_value_idx("status_code")
-        time_list_idx = logger.get_value_idx("time_list")
-        
-        for _, val in info.items():
-            
-            if val[statue_code_idx] == 0:
-                task_trans_time, task_wait_time, task_exe_time = val[time_list_idx][0], val[time_list_idx][1], val[time_list_idx][2]
-                latencies.append(task_wait_time + task_exe_time + task_trans_time)
 
         if len(info) == 0:
             return eps
 
-        return sum(latencies) / len(info)
+        return info.success_time_sum / len(info)
 
 
 class AvgEnergy(object):
@@ -63,17 +50,9 @@ class AvgEnergy(object):
 
     def eval(self, logger, eps=1e-6) -> float:
         
-        energy = []
         info = logger.task_info
-
-        energy_list_idx = logger.get_value_idx("time_list")
-        
-        for _, val in info.items():
-
-            task_trans_energy, task_exe_energy = val[energy_list_idx][0], val[energy_list_idx][1]
-            energy.append(task_trans_energy + task_exe_energy)
   
-        if len(energy) == 0:
+        if len(info) == 0:
             return eps
 
-        return sum(energy) / len(energy)
+        return info.energy_sum / len(info)
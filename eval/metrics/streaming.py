@@ -0,0 +1,174 @@
+import math
+from typing import Dict, Iterable, Optional
+
+
+class QuantileSketch(object):
+    """A mergeable quantile sketch with relative accuracy, for non-negative values.
+
+    Values are counted in logarithmic buckets (as in DDSketch): any quantile is returned within
+    `relative_accuracy` of the exact value, and two sketches with the same accuracy merge by
+    adding their bucket counts. The number of buckets is bounded by `max_bins`; beyond it, the
+    lowest buckets are collapsed, which only degrades the accuracy of the lowest quantiles.
+    """
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1).")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins: Dict[int, int] = {}  # bucket key -> count
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Add a value to the sketch."""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        """Merge the lowest buckets until the number of buckets fits max_bins."""
+        keys = sorted(self.bins)
+        n_extra = len(keys) - self.max_bins
+        target = keys[n_extra]
+        for key in keys[:n_extra]:
+            self.bins[target] += self.bins.pop(key)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Merge another sketch with the same relative accuracy into this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracies.")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated q-quantile (0 <= q <= 1), or NaN if the sketch is empty."""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """The exact mean of the added values, or NaN if the sketch is empty."""
+        return self.sum / self.count if self.count else math.nan
+
+
+class StreamingMetrics(object):
+    """Streaming latency and energy distributions, fed on task completion.
+
+    Subscribe it to the task records of an environment (``env.logger.task_info.subscribe``)
+    to keep, with constant memory per metric, the distribution of:
+        - the latency (trans + wait + exe time) of the successful tasks,
+        - the energy (trans + exe energy) of all tasks,
+    overall, per destination node and per source node. Instances from parallel workers
+    (e.g., GA evaluations or sweep runs) merge with :meth:`merge`.
+    """
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.reset()
+
+    def _sketch(self) -> QuantileSketch:
+        return QuantileSketch(self.relative_accuracy)
+
+    def reset(self) -> None:
+        """Discard all observations."""
+        self.latency = self._sketch()
+        self.energy = self._sketch()
+        self.node_latency: Dict[str, QuantileSketch] = {}
+        self.node_energy: Dict[str, QuantileSketch] = {}
+        self.source_latency: Dict[str, QuantileSketch] = {}
+        self.source_energy: Dict[str, QuantileSketch] = {}
+
+    def _add(self, sketches: Dict[str, QuantileSketch], key: Optional[str], value: float) -> None:
+        if key is None:
+            return
+        sketch = sketches.get(key)
+        if sketch is None:
+            sketch = sketches[key] = self._sketch()
+        sketch.add(value)
+
+    def observe(self, task_id, status: int, src_name: str, dst_name: Optional[str],
+                latency: float, energy: float) -> None:
+        """Record a finished task (status 0 for success)."""
+        self.energy.add(energy)
+        self._add(self.node_energy, dst_name, energy)
+        self._add(self.source_energy, src_name, energy)
+        if status == 0:
+            self.latency.add(latency)
+            self._add(self.node_latency, dst_name, latency)
+            self._add(self.source_latency, src_name, latency)
+
+    def merge(self, other: "StreamingMetrics") -> "StreamingMetrics":
+        """Merge the observations of another instance into this one."""
+        self.latency.merge(other.latency)
+        self.energy.merge(other.energy)
+        for mine, theirs in ((self.node_latency, other.node_latency),
+                             (self.node_energy, other.node_energy),
+                             (self.source_latency, other.source_latency),
+                             (self.source_energy, other.source_energy)):
+            for key, sketch in theirs.items():
+                if key in mine:
+                    mine[key].merge(sketch)
+                else:
+                    mine[key] = self._sketch().merge(sketch)
+        return self
+
+    @classmethod
+    def merged(cls, metrics: Iterable["StreamingMetrics"]) -> "StreamingMetrics":
+        """Merge several instances into a new one."""
+        metrics = list(metrics)
+        result = cls(metrics[0].relative_accuracy if metrics else 0.01)
+        for item in metrics:
+            result.merge(item)
+        return result
+
+    @classmethod
+    def quantiles(cls, sketch: QuantileSketch) -> Dict[str, float]:
+        """Return the P50, P95 and P99 of a sketch, e.g., {'P50': ..., 'P95': ..., 'P99': ...}."""
+        return {f"P{round(q * 100)}": sketch.quantile(q) for q in cls.QUANTILES}
+
+    def summary(self) -> Dict[str, dict]:
+        """Return the percentiles overall, per node and per source, for the latency and the energy."""
+        return {
+            'latency': self.quantiles(self.latency),
+            'energy': self.quantiles(self.energy),
+            'node_latency': {k: self.quantiles(v) for k, v in self.node_latency.items()},
+            'node_energy': {k: self.quantiles(v) for k, v in self.node_energy.items()},
+            'source_latency': {k: self.quantiles(v) for k, v in self.source_latency.items()},
+            'source_energy': {k: self.quantiles(v) for k, v in self.source_energy.items()},
+        }
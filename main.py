@@ -19,6 +19,7 @@ import yaml
 
 
 from core.task import Task
+from core.task_table import TaskTable
 from core.vis import *
 from core.vis.vis_stats import VisStats
 
@@ -38,7 +39,7 @@ from utils.utils import Logger, Checkpoint
 
 
 
-def run_epoch(config, policy, data: pd.DataFrame, train=True, lambda_=(1, 1, 1
+def run_epoch(config, policy, data: TaskTable, train=True, lambda_=(1, 1, 1
                                                                        ), max_total_time=0, max_total_energy=0,
               ):
     """
@@ -54,6 +55,8 @@ def run_epoch(config, policy, data: pd.DataFrame, train=True, lambda_=(1, 1, 1
       
     Every 'batch_size' tasks, update the policy.
     """
+    if isinstance(data, pd.DataFrame):
+        data = TaskTable.from_dataframe(data)
 
     m1 = SuccessRate()
     m2 = AvgLatency()
@@ -63,27 +66,22 @@ def run_epoch(config, policy, data: pd.DataFrame, train=True, lambda_=(1, 1, 1
     until = 0
     launched_task_cnt = 0
     last_task_id = None
-    pbar = tqdm(data.iterrows(), total=len(data))
+    pbar = tqdm(data, total=len(data))
     stored_transitions = {}
     number_in_batch = config.get("training", {}).get("batch_size", 32)
 
     env.max_total_time = max_total_time
     env.max_total_energy = max_total_energy
 
-    for i, task_info in pbar:
-        generated_time = task_info['GenerationTime']
-        task = Task(task_id=task_info['TaskID'],
-                    task_size=task_info['TaskSize'],
-                    cycles_per_bit=task_info['CyclesPerBit'],
-                    trans_bit_rate=task_info['TransBitRate'],
-                    ddl=task_info['DDL'] ,
-                    src_name=task_info['SrcName'] if 'SrcName' in task_info else 'e0',
-                    task_name=task_info['TaskName'])
+    for task_info in pbar:
+        generated_time = task_info.generation_time
+        task = task_info.to_task(env.task_pool)
 
         # Wait until the simulation reaches the task's generation time.
         while True:
             while env.done_task_info:
                 item = env.done_task_info.pop(0)
+            env.failed_task_info.clear()
             
             if env.now >= generated_time:
                 # Get action and current state from the policy.
@@ -100,7 +98,7 @@ def run_epoch(config, policy, data: pd.DataFrame, train=True, lambda_=(1, 1, 1
                 
                 break
             
-            until += env.refresh_rate
+            until = env.next_until(until, generated_time)
             
             try:
                 env.run(until=until)
@@ -149,7 +147,7 @@ def run_epoch(config, policy, data: pd.DataFrame, train=True, lambda_=(1, 1, 1
 
     # Continue simulation until all tasks are processed.
     while env.task_count < launched_task_cnt:
-        until += env.refresh_rate
+        until = env.next_until(until)
         try:
             env.run(until=until)
         except Exception as e:
@@ -237,11 +235,11 @@ def main():
         valid_size = config["training"].get("valid_size", 0.2)
 
         # Load train and test datasets.
-        train_data = pd.read_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/trainset.csv")
-        train_data, valid_data = train_data.iloc[:int(len(train_data)*(1-valid_size))], train_data.iloc[int(len(train_data)*(1-valid_size)):]
-        valid_data["GenerationTime"] = valid_data["GenerationTime"] - valid_data["GenerationTime"].min()  # Normalize generation time
+        train_data = TaskTable.from_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/trainset.csv")
+        train_data, valid_data = train_data[:int(len(train_data)*(1-valid_size))], train_data[int(len(train_data)*(1-valid_size)):]
+        valid_data = valid_data.normalize_time()  # Normalize generation time
         
-    test_data = pd.read_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/testset.csv")
+    test_data = TaskTable.from_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/testset.csv")
     
     #         # Load train and test datasets.
     # train_data = pd.read_csv(f"eval/benchmarks/Topo4MEC/data/25N50E/trainset.csv")
@@ -2,10 +2,12 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import random
+import numpy as np
 from torch.distributions import Categorical  # (optional for epsilon random selection)
 
 from core.env import Env
 from core.task import Task
+from policies.observation import ObservationBuilder
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")   
 
@@ -56,26 +58,8 @@ class MLPPolicy:
         Returns a flat observation vector.
         For instance, returns free CPU frequency for each node combined with free bandwidth per link.
         """
-        
-        
-        obs = []
-        
-        if "cpu" in obs_type:
-            cpu_obs = [env.scenario.get_node(node_name).free_cpu_freq 
-                       for node_name in env.scenario.get_nodes()]
-            obs += cpu_obs
-            
-        if "buffer" in obs_type:
-            buffer_obs = [env.scenario.get_node(node_name).buffer_free_size()
-                          for node_name in env.scenario.get_nodes()]
-            obs += buffer_obs
-            
-        if "bw" in obs_type:
-            bw_obs = [env.scenario.get_link(link_name[0], link_name[1]).free_bandwidth
-                      for link_name in env.scenario.get_links()]
-            obs += bw_obs
-
-        return obs
+        # The builder reuses its buffer; copy it so that the replay buffer keeps a snapshot.
+        return ObservationBuilder.of(env, obs_type).flat_observation().copy()
 
     def act(self, env, task, train=True):
         """
@@ -110,9 +94,9 @@ class MLPPolicy:
 
         # Unpack transitions and convert to batched tensors.
         states, actions, rewards, next_states, dones = zip(*self.replay_buffer)
-        states = torch.tensor(states, dtype=torch.float32).to(device)
+        states = torch.tensor(np.array(states), dtype=torch.float32).to(device)
         rewards = torch.tensor(rewards, dtype=torch.float32).to(device)
-        next_states = torch.tensor(next_states, dtype=torch.float32).to(device)
+        next_states = torch.tensor(np.array(next_states), dtype=torch.float32).to(device)
         dones = torch.tensor(dones, dtype=torch.float32).to(device)
         
         actions_tensor = torch.tensor(actions, dtype=torch.int64).to(device).unsqueeze(1)
@@ -10,6 +10,7 @@ import numpy as np
 
 from core.env import Env
 from core.task import Task
+from policies.observation import ObservationBuilder
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")   
 dtype = torch.float32
@@ -61,57 +62,13 @@ class TaskFormerPolicy:
 
     def _make_observation(self, env: Env, task: Task, obs_type=["cpu", "buffer", "bw"]):
         """
-        Returns a flat observation vector.
-        For instance, we return the free CPU frequency for each node.
+        Returns the (nodes, task) observation pair.
+        Each node row holds its free CPU frequency, free buffer size and the bottleneck
+        bandwidth on the shortest path from the task's source node.
         """
-        
-        
-        obs = np.zeros((len(env.scenario.get_nodes()), len(obs_type)))
-        
-        for i, node_name in enumerate(env.scenario.get_nodes()):
-            if "cpu" in obs_type:
-                obs[env.scenario.node_name2id[node_name], obs_type.index("cpu")] = env.scenario.get_node(node_name).free_cpu_freq 
-            if "buffer" in obs_type:
-                obs[env.scenario.node_name2id[node_name], obs_type.index("buffer")] = env.scenario.get_node(node_name).buffer_free_size()
-            if "bw" in obs_type and task is not None:
-                # Get the bandwidth for the link associated with the task
-                src_node = task.src_name
-                if node_name != src_node:
-                    obs[env.scenario.node_name2id[node_name], obs_type.index("bw")] = min(link.free_bandwidth for link in env.scenario.infrastructure.get_shortest_links(src_node, node_name))
-                else:
-                    obs[env.scenario.node_name2id[node_name], obs_type.index("bw")] = max(link.free_bandwidth for link in env.scenario.infrastructure.get_links().values())
-
-        # for i, link_name in enumerate(env.scenario.get_links()):
-        #
-        #     if link_name[0] == 'e0':
-        #         obs[env.scenario.node_name2id[link_name[1]], 2] = bw_obs[link_name]
-        #     else:
-        #         obs[env.scenario.node_name2id[link_name[0]], 3] = bw_obs[link_name]
-        
-
-        
-        if task is None:
-            task_obs = [0, 0, 0, 0]
-        else:
-            task_obs = [
-                task.task_size,
-                task.cycles_per_bit,
-                task.trans_bit_rate,
-                task.ddl,
-            ]
-            # obs["bw"] = {}
-            
-            # src_node = task.src_name
-
-
-            # for node_name in env.scenario.get_nodes():
-            #     if node_name == src_node:
-            #         obs["bw"][node_name] = 0
-            #     for link in env.scenario.infrastructure.get_longest_shortest_path(src_node, dst_node):
-            #         if link[0] == node_name or link[1] == node_name:
-            #             obs["bw"][node_name] = min(env.scenario.get_node(node_name).free_bandwidth for link in env.scenario.infrastructure.get_longest_shortest_path(src_node, dst_node) if link[0] == node_name or link[1] == node_name)
-
-        return obs, task_obs
+        obs, task_obs = ObservationBuilder.of(env, obs_type).node_observation(task)
+        # The builder reuses its buffers; copy them so that the replay buffer keeps a snapshot.
+        return obs.copy(), task_obs.copy()
 
     def act(self, env, task, train=True):
         """
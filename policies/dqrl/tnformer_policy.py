@@ -10,6 +10,7 @@ import numpy as np
 
 from core.env import Env
 from core.task import Task
+from policies.observation import ObservationBuilder
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")   
 dtype = torch.float32
@@ -61,41 +62,13 @@ class TaskFormerPolicy:
 
     def _make_observation(self, env, task):
         """
-        Returns a flat observation vector.
-        For instance, we return the free CPU frequency for each node.
+        Returns the (nodes, task) observation pair.
+        Each node row holds its free CPU frequency, free buffer size, the free bandwidth
+        of the link from e0 and the free bandwidth of the link leaving the node.
         """
-        cpu_obs = {node_name: env.scenario.get_node(node_name).free_cpu_freq 
-               for node_name in env.scenario.get_nodes()}
-        
-        buffer_obs = {node_name: env.scenario.get_node(node_name).buffer_free_size()
-               for node_name in env.scenario.get_nodes()}
-        # print(env.scenario.get_links())
-        bw_obs = {link_name:env.scenario.get_link(link_name[0], link_name[1]).free_bandwidth for link_name in env.scenario.get_links()}
-        
-        obs = np.zeros((len(env.scenario.get_nodes()), 4))
-        
-        for i, node_name in enumerate(env.scenario.get_nodes()):
-            obs[env.scenario.node_name2id[node_name], 0] = cpu_obs[node_name]
-            obs[env.scenario.node_name2id[node_name], 1] = buffer_obs[node_name]
-
-        for i, link_name in enumerate(env.scenario.get_links()):
-            
-            if link_name[0] == 'e0':
-                obs[env.scenario.node_name2id[link_name[1]], 2] = bw_obs[link_name]
-            else:
-                obs[env.scenario.node_name2id[link_name[0]], 3] = bw_obs[link_name]
-        
-        if task is None:
-            task_obs = [0, 0, 0, 0]
-        else:
-            task_obs = [
-                task.task_size,
-                task.cycles_per_bit,
-                task.trans_bit_rate,
-                task.ddl,
-            ]
-        
-        return obs, task_obs
+        obs, task_obs = ObservationBuilder.of(env, ("cpu", "buffer", "bw_from_e0", "bw_out")).node_observation(task)
+        # The builder reuses its buffers; copy them so that the replay buffer keeps a snapshot.
+        return obs.copy(), task_obs.copy()
 
     def act(self, env, task, train=True):
         """
@@ -16,13 +16,16 @@ class GreedyPolicy:
         """
         best_node = None
         best_latency = float('inf')
+        src_id = env.scenario.node_name2id[task.src_name]
 
         # Iterate through all possible node IDs in the environment
         for node_id in range(len(env.scenario.node_id2name)):
             node_name = env.scenario.node_id2name[node_id]
 
             cpu_speed = env.scenario.get_node(node_name).free_cpu_freq
-            transmission_time = task.task_size / task.trans_bit_rate  # seconds
+            # Base latency of the path plus the per-hop transfer delay (seconds)
+            transmission_time = (env.scenario.path_latency[src_id, node_id] + 
+                                 task.task_size / task.trans_bit_rate * env.scenario.path_hops[src_id, node_id])
             computation_time = (task.task_size * task.cycles_per_bit) /( cpu_speed + 1)
             
             total_time = transmission_time + computation_time
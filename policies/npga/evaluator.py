@@ -0,0 +1,110 @@
+import multiprocessing
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from policies.npga.fitness_cache import FitnessCache, dataset_fingerprint
+
+# State of a worker process of a ParallelEvaluator, set once by _init_worker
+_WORKER: dict = {}
+
+
+def _init_worker(evaluate: Callable, config: dict, datasets: Dict[str, Any]):
+    _WORKER['evaluate'] = evaluate
+    _WORKER['config'] = config
+    _WORKER['datasets'] = datasets
+
+
+def _evaluate(args):
+    individual, dataset = args
+    return _WORKER['evaluate'](individual, _WORKER['datasets'][dataset], _WORKER['config'])
+
+
+class ParallelEvaluator:
+    """
+    Long-lived pool of worker processes evaluating the individuals of a genetic algorithm.
+
+    The workers are started once, with the config and the datasets (e.g., the train, validation
+    and test TaskTables), which are inherited by the forked workers, or sent once per worker
+    otherwise. Each worker then keeps its simulation state across evaluations (the scenario and
+    task pool are reused by utils.create_env), so that only the individuals and the name of the
+    dataset cross the process boundaries, and the fitness on the way back.
+
+    Usage:
+        with ParallelEvaluator(evaluate_individual, config, {"train": train_data}) as evaluator:
+            results = evaluator.map(policy.individuals(), "train")
+
+    Attributes:
+        evaluate: The evaluation function, called as evaluate(individual, data, config) in the
+            workers; it must be picklable (i.e., defined at module level).
+        config: The configuration passed to evaluate.
+        datasets: The datasets, by name.
+        processes: Number of worker processes; all CPUs but one by default. If 0, the
+            individuals are evaluated in the calling process.
+        cache: Optional FitnessCache, consulted before dispatching the individuals: only the
+            individuals whose results are not cached (once per distinct genome) are evaluated.
+    """
+
+    def __init__(self, evaluate: Callable, config: dict, datasets: Dict[str, Any],
+                 processes: Optional[int] = None, cache: Optional[FitnessCache] = None):
+        self.evaluate = evaluate
+        self.config = config
+        self.datasets = datasets
+        self.cache = cache
+        self._fingerprints = {}
+        if cache is not None:
+            self._fingerprints = {name: dataset_fingerprint(data, config) for name, data in datasets.items()}
+        self.processes = max(1, multiprocessing.cpu_count() - 1) if processes is None else processes
+        self._pool = None
+        if self.processes > 0:
+            self._pool = multiprocessing.Pool(processes=self.processes, initializer=_init_worker,
+                                              initargs=(evaluate, config, datasets))
+
+    def map(self, individuals: Iterable, dataset: str) -> List:
+        """Evaluate the individuals on a dataset, in parallel. Return the results in order."""
+        if dataset not in self.datasets:
+            raise KeyError(f"Unknown dataset {dataset!r}: expected one of {list(self.datasets)}.")
+        individuals = list(individuals)
+        if self.cache is None:
+            return self._dispatch(individuals, dataset)
+        
+        keys = [self.cache.key(individual, self._fingerprints[dataset]) for individual in individuals]
+        results = {}
+        pending = {}  # Individuals to evaluate, by key: identical genomes are evaluated once
+        for key, individual in zip(keys, individuals):
+            if key in results or key in pending:
+                continue
+            result = self.cache.get(key)
+            if result is None:
+                pending[key] = individual
+            else:
+                results[key] = result
+        evaluated = list(zip(pending, self._dispatch(list(pending.values()), dataset)))
+        self.cache.put_many(evaluated)
+        results.update(evaluated)
+        return [results[key] for key in keys]
+
+    def _dispatch(self, individuals: List, dataset: str) -> List:
+        """Evaluate the individuals on a dataset, in the workers."""
+        if not individuals:
+            return []
+        if self._pool is None:
+            return [self.evaluate(individual, self.datasets[dataset], self.config) for individual in individuals]
+        return self._pool.map(_evaluate, [(individual, dataset) for individual in individuals], chunksize=1)
+
+    def close(self):
+        """Stop the worker processes, and close the cache."""
+        if self.cache is not None:
+            self.cache.close()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self.close()
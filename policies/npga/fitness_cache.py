@@ -0,0 +1,128 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from core.env import SIMULATOR_VERSION
+
+
+def genome_digest(individual) -> str:
+    """Return a digest of the genome of an individual: its weight matrices, bias vectors and observation."""
+    digest = hashlib.sha1()
+    digest.update(f"{type(individual).__module__}.{type(individual).__qualname__}:{individual.obs_type};".encode())
+    for array in list(individual.weights) + list(getattr(individual, "biases", [])):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}:{array.shape};".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(data, config: dict) -> str:
+    """
+    Return a fingerprint of an evaluation setting: the dataset (e.g., a TaskTable), and the
+    sections of the config defining the scenario and the metrics ("env" and "eval").
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps({section: config.get(section) for section in ("env", "eval")},
+                             sort_keys=True, default=str).encode())
+    if hasattr(data, "fingerprint"):
+        digest.update(data.fingerprint().encode())
+    else:
+        digest.update(pickle.dumps(data))
+    return digest.hexdigest()
+
+
+class FitnessCache:
+    """
+    Cache of the evaluation results of the individuals of a genetic algorithm.
+
+    Across generations, many individuals survive unchanged (elitism, or parents copied without
+    crossover), and need not be simulated again on the same dataset. The results are keyed by
+    the genome of the individual, the fingerprint of the dataset and scenario, and the
+    SIMULATOR_VERSION of core.env (bumped when the simulation results change).
+
+    The most recently used results are kept in memory, up to max_size. If a path is given, all
+    the results are also stored in an SQLite file, and reused across runs.
+
+    Usage:
+        cache = FitnessCache(max_size=10000, path="logs/fitness_cache.sqlite")
+        key = cache.key(individual, dataset_fingerprint(train_data, config))
+        result = cache.get(key)
+        if result is None:
+            result = evaluate_individual(individual, train_data, config)
+            cache.put(key, result)
+
+    The cached results are shared and must not be modified.
+    """
+
+    def __init__(self, max_size: int = 10000, path: Optional[str] = None):
+        if max_size < 1:
+            raise ValueError("The size of the cache must be at least 1.")
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS fitness (key TEXT PRIMARY KEY, value BLOB)")
+            self._db.commit()
+
+    @staticmethod
+    def key(individual, fingerprint: str) -> str:
+        """Return the key of the results of an individual on the dataset with the given fingerprint."""
+        return f"{SIMULATOR_VERSION}:{fingerprint}:{genome_digest(individual)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result, or None."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        if self._db is not None:
+            row = self._db.execute("SELECT value FROM fitness WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                try:
+                    value = pickle.loads(row[0])
+                except (pickle.UnpicklingError, AttributeError, ImportError, EOFError):
+                    value = None  # Stored by an incompatible version of the code
+                if value is not None:
+                    self._remember(key, value)
+                    self.hits += 1
+                    return value
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any):
+        """Cache a result."""
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        """Cache (key, result) pairs, in a single transaction of the on-disk store."""
+        items = list(items)
+        for key, value in items:
+            self._remember(key, value)
+        if self._db is not None and items:
+            self._db.executemany("INSERT OR REPLACE INTO fitness (key, value) VALUES (?, ?)",
+                                 [(key, pickle.dumps(value)) for key, value in items])
+            self._db.commit()
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def close(self):
+        """Close the on-disk store."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,7 +1,9 @@
-import random
 import numpy as np
 from core.env import Env
 from core.task import Task
+from policies.npga.operators import (GenomeLayout, arithmetic_crossover, dominance_matrix, 
+                                     gaussian_mutation, sample_distinct)
+from policies.observation import ObservationBuilder
 
 class Individual:
     def __init__(self, weights, obs_type=["cpu", "buffer", "bw"]):
@@ -19,20 +21,7 @@ class Individual:
         """
         if env is None:
             raise ValueError("Environment must be provided.")
-        obs = []
-        if "cpu" in obs_type:
-            cpu_obs = [env.scenario.get_node(node_name).free_cpu_freq 
-                       for node_name in env.scenario.get_nodes()]
-            obs += cpu_obs
-        if "buffer" in obs_type:
-            buffer_obs = [env.scenario.get_node(node_name).buffer_free_size()
-                          for node_name in env.scenario.get_nodes()]
-            obs += buffer_obs
-        if "bw" in obs_type:
-            bw_obs = [env.scenario.get_link(link_name[0], link_name[1]).free_bandwidth
-                      for link_name in env.scenario.get_links()]
-            obs += bw_obs
-        return np.array(obs)
+        return ObservationBuilder.of(env, obs_type).flat_observation()
 
     def act(self, env, task):
         """
@@ -60,10 +49,13 @@ class NPGAPolicy:
         # Use a helper to determine observation size.
         self.n_observations = len(self._make_observation(self.env, None, self.obs_type))
         self.num_actions = len(self.env.scenario.node_id2name)
+        self.layout = GenomeLayout(self.weight_shapes())
         
-        # Initialize population: each individual is represented as a list of weight matrices.
-        self.population = [self.genenerate_individual() 
-                           for _ in range(config["training"]["pop_size"])]
+        # Initialize population: one genome (the flattened weight matrices) per row.
+        self.population = np.stack([self.genenerate_individual() 
+                                    for _ in range(config["training"]["pop_size"])])
+        self.fitness = None  # Objective tuples of the population, once evaluated
+        self.survivors = None  # Indices of the population among the parents, then the offspring, of the last update
     
     def _make_observation(self, env, task, obs_type):
         """
@@ -71,117 +63,89 @@ class NPGAPolicy:
         """
         if env is None:
             raise ValueError("Environment must be provided to determine observation size.")
-        obs = []
-        if "cpu" in obs_type:
-            cpu_obs = [env.scenario.get_node(node_name).free_cpu_freq 
-                       for node_name in env.scenario.get_nodes()]
-            obs += cpu_obs
-        if "buffer" in obs_type:
-            buffer_obs = [env.scenario.get_node(node_name).buffer_free_size()
-                          for node_name in env.scenario.get_nodes()]
-            obs += buffer_obs
-        if "bw" in obs_type:
-            bw_obs = [env.scenario.get_link(link_name[0], link_name[1]).free_bandwidth
-                      for link_name in env.scenario.get_links()]
-            obs += bw_obs
-        return obs
+        return ObservationBuilder.of(env, obs_type).flat_observation()
 
-    def genenerate_individual(self):
+    def weight_shapes(self):
         """
-        Generate a new individual with random weights.
+        Return the shapes of the weight matrices of an individual.
         """
         if self.n_layers < 1:
             raise ValueError("The number of layers must be at least 1.")
         elif self.n_layers == 1:
-            weights = [np.random.rand(self.n_observations, self.num_actions)]
-        elif self.n_layers == 2:
-            weights = [np.random.rand(self.n_observations, self.d_model),
-                       np.random.rand(self.d_model, self.num_actions)]
-        else:
-            weights = [np.random.rand(self.n_observations, self.d_model)]
-            for _ in range(self.n_layers - 2):
-                weights.append(np.random.rand(self.d_model, self.d_model))
-            weights.append(np.random.rand(self.d_model, self.num_actions))
-        return weights
+            return [(self.n_observations, self.num_actions)]
+        return ([(self.n_observations, self.d_model)] 
+                + [(self.d_model, self.d_model)] * (self.n_layers - 2) 
+                + [(self.d_model, self.num_actions)])
+
+    def genenerate_individual(self):
+        """
+        Generate a new individual with random weights, as a genome.
+        """
+        return np.random.rand(self.layout.size)
     
-    def individuals(self):
+    def individuals(self, genomes=None):
         """
-        Wrap the current population into Individual objects.
+        Wrap the current population (or the given genomes) into Individual objects.
         """
-        return [Individual(weights, self.obs_type.copy()) for weights in self.population.copy()]
+        genomes = self.population if genomes is None else genomes
+        return [Individual(self.layout.unflatten(genome), self.obs_type.copy()) for genome in genomes]
     
     
     # ---------------------------
     # NPGA Helper Functions
     # ---------------------------
-    @staticmethod
-    def dominates(obj1, obj2):
+    def npga_tournament_selection(self, fitness, n_selections, niche_size):
         """
-        Check if objective vector obj1 dominates obj2 (assuming minimization).
-        """
-        better_or_equal = all(a <= b for a, b in zip(obj1, obj2))
-        strictly_better = any(a < b for a, b in zip(obj1, obj2))
-        return better_or_equal and strictly_better
-
-    def npga_tournament_selection(self, population, fitness, niche_size):
-        """
-        Perform a NPGA-style binary tournament selection.
-        Two individuals are randomly chosen and a niche is formed (a random subset of indices).
+        Perform n_selections NPGA-style binary tournaments, as a batch.
+        For each tournament, two individuals are randomly chosen and a niche is formed (a random subset of indices).
         The candidate with fewer dominations from the niche wins the tournament.
+        Returns the indices of the winners.
         """
-        i, j = random.sample(range(len(population)), 2)
-        candidate1 = population[i]
-        candidate2 = population[j]
-        
-        # Create a niche: randomly select niche_size individuals from the population.
-        niche_indices = random.sample(range(len(population)), min(niche_size, len(population)))
-        
-        def niche_domination_count(candidate_fit):
-            count = 0
-            for idx in niche_indices:
-                if self.dominates(fitness[idx], candidate_fit):
-                    count += 1
-            return count
+        pop_size = len(fitness)
+        dominates = dominance_matrix(fitness)
+        candidates = sample_distinct(n_selections, pop_size, 2)
+        niches = sample_distinct(n_selections, pop_size, niche_size)
         
-        count1 = niche_domination_count(fitness[i])
-        count2 = niche_domination_count(fitness[j])
+        # Number of individuals of the niche dominating each candidate.
+        count1 = dominates[niches, candidates[:, :1]].sum(axis=1)
+        count2 = dominates[niches, candidates[:, 1:]].sum(axis=1)
         
-        if count1 < count2:
-            return candidate1
-        elif count2 < count1:
-            return candidate2
-        else:
-            return candidate1 if random.random() < 0.5 else candidate2
+        coin = np.random.random(n_selections) < 0.5
+        first_wins = (count1 < count2) | ((count1 == count2) & coin)
+        return np.where(first_wins, candidates[:, 0], candidates[:, 1])
 
-    def mutate_matrix(self, matrix, mutation_rate=None, sigma=0.1):
+    def mutate(self, genomes, mutation_rate=None, sigma=0.1):
         """
-        Apply Gaussian mutation elementwise to a weight matrix.
+        Apply Gaussian mutation elementwise to the genomes, keeping the weights non-negative.
         """
         if mutation_rate is None:
             mutation_rate = self.config["training"].get("mutation_rate", 0.1)
-        new_matrix = np.copy(matrix)
-        rows, cols = new_matrix.shape
-        for i in range(rows):
-            for j in range(cols):
-                if random.random() < mutation_rate:
-                    new_matrix[i, j] += np.random.normal(0, sigma)
-        return np.clip(new_matrix, 0, None)
+        return np.clip(gaussian_mutation(genomes, mutation_rate, sigma), 0, None)
     
-    def crossover(self, parent1, parent2):
+    def crossover(self, parents1, parents2):
         """
-        Perform arithmetic crossover between two weight matrices.
+        Perform arithmetic crossover between pairs of genomes, with one random alpha per weight matrix.
         """
-        alpha = random.random()
-        child = []
-        for w1, w2 in zip(parent1, parent2):
-            child_w = alpha * w1 + (1 - alpha) * w2
-            child.append(child_w)
-        return child
+        alpha = np.random.random((len(parents1), len(self.layout.shapes)))[:, self.layout.segment_ids]
+        return arithmetic_crossover(parents1, parents2, alpha)
     
     # ---------------------------
     # NPGA Update Routine
     # ---------------------------
-    def update(self, fitness):
+    def evolve(self, fitness):
+        """
+        Breed offspring from the population: NPGA tournament selection (with a niche) of the 
+        parents, arithmetic crossover and Gaussian mutation.
+        Returns the offspring genomes, one per row (as many as the population).
+        """
+        pop_size = len(self.population)
+        niche_size = self.config["training"].get("niche_size", 5)
+        
+        parents = self.npga_tournament_selection(fitness, 2 * pop_size, niche_size)
+        children = self.crossover(self.population[parents[:pop_size]], self.population[parents[pop_size:]])
+        return self.mutate(children)
+
+    def update(self, fitness, offspring, offspring_fitness):
         """
         Update the population using an NPGA approach.
         
@@ -189,38 +153,14 @@ class NPGAPolicy:
           fitness: List of objective tuples for the current population.
                    (If objectives include success rate to be maximized, convert it here to minimization.)
                    For example, use: ( ttr, avg_latency, avg_power )
+          offspring: Offspring bred by :meth:`evolve` from fitness.
+          offspring_fitness: The objective tuples of the offspring, evaluated on the simulator 
+                   by the caller (e.g., with a policies.npga.evaluator.ParallelEvaluator).
         
-        The procedure:
-          1. Use NPGA tournament selection (with a niche) to choose parents.
-          2. Generate offspring via arithmetic crossover and Gaussian mutation.
-          3. For demonstration, simulate offspring fitness by perturbing a parent's fitness.
-          4. Replace the current population with the offspring.
+        The population is replaced with the offspring; parents are selected in :meth:`evolve`.
         """
-        pop_size = len(self.population)
-        new_population = []
-        new_fitness = []
-        niche_size = self.config["training"].get("niche_size", 5)
-        
-        # Generate offspring population.
-        while len(new_population) < pop_size:
-            parent1 = self.npga_tournament_selection(self.population, fitness, niche_size)
-            parent2 = self.npga_tournament_selection(self.population, fitness, niche_size)
-            child = []
-            # Arithmetic crossover for each corresponding weight matrix.
-            for w1, w2 in zip(parent1, parent2):
-                child_w = self.crossover(w1, w2)
-                child.append(child_w)
-            # Mutation step.
-            mutated_child = [self.mutate_matrix(w) for w in child]
-            new_population.append(mutated_child)
-            # For demonstration, simulate offspring fitness by perturbing a random parent's fitness.
-            base_fit = random.choice(fitness)
-            noise = (random.uniform(-0.01, 0.01),
-                     random.uniform(-0.01, 0.01),
-                     random.uniform(-0.01, 0.01))
-            new_fit = tuple(b + n for b, n in zip(base_fit, noise))
-            new_fitness.append(new_fit)
-        
         # Replace current population with the offspring.
-        self.population = new_population
-        return new_fitness
+        self.survivors = list(range(len(self.population), len(self.population) + len(offspring)))
+        self.population = offspring
+        self.fitness = [tuple(fit) for fit in offspring_fitness]
+        return self.fitness
@@ -1,7 +1,9 @@
-import random
 import numpy as np
 from core.env import Env
 from core.task import Task
+from policies.npga.operators import (GenomeLayout, arithmetic_crossover, dominance_matrix, 
+                                     gaussian_mutation, sample_distinct)
+from policies.observation import ObservationBuilder
 
 class Individual:
     def __init__(self, weights, biases, obs_type=["cpu", "buffer", "bw"]):
@@ -20,20 +22,7 @@ class Individual:
         """
         if env is None:
             raise ValueError("Environment must be provided.")
-        obs = []
-        if "cpu" in obs_type:
-            cpu_obs = [env.scenario.get_node(node_name).free_cpu_freq 
-                       for node_name in env.scenario.get_nodes()]
-            obs += cpu_obs
-        if "buffer" in obs_type:
-            buffer_obs = [env.scenario.get_node(node_name).buffer_free_size() 
-                          for node_name in env.scenario.get_nodes()]
-            obs += buffer_obs
-        if "bw" in obs_type:
-            bw_obs = [env.scenario.get_link(link_name[0], link_name[1]).free_bandwidth 
-                      for link_name in env.scenario.get_links()]
-            obs += bw_obs
-        return np.array(obs)
+        return ObservationBuilder.of(env, obs_type).flat_observation()
 
     def act(self, env, task):
         """
@@ -62,58 +51,56 @@ class NSGA2Policy:
         self.n_observations = len(self._make_observation(self.env, None, self.obs_type))
         self.num_actions = len(self.env.scenario.node_id2name)
 
-        # Initialize the population (each individual is a tuple of weight matrices and bias vectors).
-        self.population = [self.genenerate_individual() 
-                           for _ in range(config["training"]["pop_size"])]
+        self.layout = GenomeLayout(self.weight_shapes() + self.bias_shapes())
+
+        # Initialize the population: one genome (the flattened weight matrices, then bias vectors) per row.
+        self.population = np.stack([self.genenerate_individual() 
+                                    for _ in range(config["training"]["pop_size"])])
+        self.fitness = None  # Objective tuples of the population, once evaluated
+        self.survivors = None  # Indices of the population among the parents, then the offspring, of the last update
 
     def _make_observation(self, env, task, obs_type):
         if env is None:
             raise ValueError("Environment must be provided to determine observation size.")
-        obs = []
-        if "cpu" in obs_type:
-            cpu_obs = [env.scenario.get_node(node_name).free_cpu_freq 
-                       for node_name in env.scenario.get_nodes()]
-            obs += cpu_obs
-        if "buffer" in obs_type:
-            buffer_obs = [env.scenario.get_node(node_name).buffer_free_size() 
-                          for node_name in env.scenario.get_nodes()]
-            obs += buffer_obs
-        if "bw" in obs_type:
-            bw_obs = [env.scenario.get_link(link_name[0], link_name[1]).free_bandwidth 
-                      for link_name in env.scenario.get_links()]
-            obs += bw_obs
-        return obs
+        return ObservationBuilder.of(env, obs_type).flat_observation()
 
-    def genenerate_individual(self):
+    def weight_shapes(self):
         """
-        Generate a new individual with random weight matrices and bias vectors.
-        Returns a tuple of (weights, biases).
+        Return the shapes of the weight matrices of an individual.
         """
         if self.n_layers < 1:
             raise ValueError("The number of layers must be at least 1.")
         elif self.n_layers == 1:
-            weights = [np.random.rand(self.n_observations, self.num_actions)]
-            biases = [np.random.rand(self.num_actions)]
-        elif self.n_layers == 2:
-            weights = [np.random.rand(self.n_observations, self.d_model),
-                       np.random.rand(self.d_model, self.num_actions)]
-            biases = [np.random.rand(self.d_model),
-                      np.random.rand(self.num_actions)]
-        else:
-            weights = [np.random.rand(self.n_observations, self.d_model)]
-            biases = [np.random.rand(self.d_model)]
-            for _ in range(self.n_layers - 2):
-                weights.append(np.random.rand(self.d_model, self.d_model))
-                biases.append(np.random.rand(self.d_model))
-            weights.append(np.random.rand(self.d_model, self.num_actions))
-            biases.append(np.random.rand(self.num_actions))
-        return (weights, biases)
+            return [(self.n_observations, self.num_actions)]
+        return ([(self.n_observations, self.d_model)] 
+                + [(self.d_model, self.d_model)] * (self.n_layers - 2) 
+                + [(self.d_model, self.num_actions)])
+
+    def bias_shapes(self):
+        """
+        Return the shapes of the bias vectors of an individual.
+        """
+        return [(n_out,) for _, n_out in self.weight_shapes()]
+
+    def genenerate_individual(self):
+        """
+        Generate a new individual with random weight matrices and bias vectors, as a genome.
+        """
+        return np.random.rand(self.layout.size)
+
+    def split(self, genome):
+        """
+        Return the (weights, biases) of a genome, as views of it.
+        """
+        arrays = self.layout.unflatten(genome)
+        return arrays[:self.n_layers], arrays[self.n_layers:]
 
-    def individuals(self):
+    def individuals(self, genomes=None):
         """
-        Wrap the population's weight matrices and bias vectors into Individual objects.
+        Wrap the population's (or the given genomes') weight matrices and bias vectors into Individual objects.
         """
-        return [Individual(weights, biases, self.obs_type) for weights, biases in self.population]
+        genomes = self.population if genomes is None else genomes
+        return [Individual(*self.split(genome), self.obs_type) for genome in genomes]
 
     def best_individual(self, fitness):
         """
@@ -130,15 +117,6 @@ class NSGA2Policy:
     # -------------------------------
     # NSGA-II Helper Functions
     # -------------------------------
-    @staticmethod
-    def dominates(obj1, obj2):
-        """
-        Check if objective vector obj1 dominates obj2 (assuming minimization).
-        """
-        better_or_equal = all(a <= b for a, b in zip(obj1, obj2))
-        strictly_better = any(a < b for a, b in zip(obj1, obj2))
-        return better_or_equal and strictly_better
-
     @staticmethod
     def crowding_distance(fitness_list):
         """
@@ -147,245 +125,178 @@ class NSGA2Policy:
         num_individuals = len(fitness_list)
         if num_individuals == 0:
             return []
-        distances = [0.0] * num_individuals
-        num_objectives = len(fitness_list[0])
-        for m in range(num_objectives):
-            values = [fit[m] for fit in fitness_list]
-            sorted_indices = sorted(range(num_individuals), key=lambda i: values[i])
-            distances[sorted_indices[0]] = float('inf')
-            distances[sorted_indices[-1]] = float('inf')
-            for i in range(1, num_individuals - 1):
-                if max(values) - min(values) == 0:
-                    diff = 0
+        values = np.asarray(fitness_list, dtype=float)
+        distances = np.zeros(num_individuals)
+        for m in range(values.shape[1]):
+            # Stable sort, so that tied solutions keep their order
+            sorted_indices = np.argsort(values[:, m], kind='stable')
+            sorted_values = values[sorted_indices, m]
+            distances[sorted_indices[0]] = np.inf
+            distances[sorted_indices[-1]] = np.inf
+            value_range = sorted_values[-1] - sorted_values[0]
+            if num_individuals > 2:
+                if value_range == 0:
+                    diff = 0.0
                 else:
-                    diff = (values[sorted_indices[i+1]] - values[sorted_indices[i-1]]) / (max(values) - min(values))
-                distances[sorted_indices[i]] += diff
-        return distances
+                    diff = (sorted_values[2:] - sorted_values[:-2]) / value_range
+                distances[sorted_indices[1:-1]] += diff
+        return distances.tolist()
 
     def non_dominated_sort(self, fitness):
         """
         Perform non-dominated sorting on the population.
         Returns a list of fronts (each front is a list of indices).
+
+        The fronts are peeled from the dominance matrix. Within a front, the solutions are in the
+        order of the reference fast non-dominated sort: the first front by index, and the next ones
+        by the position of their last dominator in the previous front, then by index.
         """
         population_size = len(fitness)
-        S = [[] for _ in range(population_size)]
-        n = [0] * population_size
-        fronts = [[]]
-        for p in range(population_size):
-            for q in range(population_size):
-                if self.dominates(fitness[p], fitness[q]):
-                    S[p].append(q)
-                elif self.dominates(fitness[q], fitness[p]):
-                    n[p] += 1
-            if n[p] == 0:
-                fronts[0].append(p)
-        i = 0
-        while fronts[i]:
-            next_front = []
-            for p in fronts[i]:
-                for q in S[p]:
-                    n[q] -= 1
-                    if n[q] == 0:
-                        next_front.append(q)
-            i += 1
-            fronts.append(next_front)
-        fronts.pop()  # remove the last empty front.
+        if population_size == 0:
+            return []
+        dominates = dominance_matrix(fitness)
+        n = dominates.sum(axis=0)  # Number of solutions dominating each solution
+        front = np.flatnonzero(n == 0)
+        fronts = []
+        while len(front):
+            fronts.append(front.tolist())
+            dominated = dominates[front]
+            n = n - dominated.sum(axis=0)
+            candidates = np.flatnonzero((n == 0) & dominated.any(axis=0))
+            # Position in the front of the last dominator of each candidate
+            last_dominator = len(front) - 1 - np.argmax(dominated[::-1, candidates], axis=0)
+            front = candidates[np.lexsort((candidates, last_dominator))]
         return fronts
 
     def select_next_generation(self, combined_population, combined_fitness, pop_size):
         """
         Use non-dominated sorting and crowding distance to select the next generation.
         """
+        selected = self.select_survivors(combined_fitness, pop_size)
+        new_population = np.asarray(combined_population)[selected]
+        new_fitness = [combined_fitness[idx] for idx in selected]
+        return new_population, new_fitness
+
+    def select_survivors(self, combined_fitness, pop_size):
+        """
+        Return the indices of the pop_size individuals selected by non-dominated sorting and crowding distance.
+        """
         fronts = self.non_dominated_sort(combined_fitness)
-        new_population = []
-        new_fitness = []
+        selected = []
         for front in fronts:
-            if len(new_population) + len(front) <= pop_size:
-                for idx in front:
-                    new_population.append(combined_population[idx])
-                    new_fitness.append(combined_fitness[idx])
+            if len(selected) + len(front) <= pop_size:
+                selected.extend(front)
             else:
                 front_fitness = [combined_fitness[idx] for idx in front]
                 distances = self.crowding_distance(front_fitness)
                 # Sort the front based on descending crowding distance.
                 sorted_front = sorted(list(zip(front, distances)), key=lambda x: -x[1])
-                for idx, _ in sorted_front:
-                    if len(new_population) < pop_size:
-                        new_population.append(combined_population[idx])
-                        new_fitness.append(combined_fitness[idx])
-                    else:
-                        break
+                selected.extend(idx for idx, _ in sorted_front[:pop_size - len(selected)])
                 break
-        return new_population, new_fitness
-
-    def mutate_matrix(self, matrix, mutation_rate=None, sigma=0.1):
-        """
-        Apply Gaussian mutation to each element of the matrix.
-        """
-        if mutation_rate is None:
-            mutation_rate = self.config["training"].get("mutation_rate", 0.1)
-        new_matrix = np.copy(matrix)
-        rows, cols = new_matrix.shape
-        for i in range(rows):
-            for j in range(cols):
-                if random.random() < mutation_rate:
-                    new_matrix[i, j] += np.random.normal(0, sigma)
-        return new_matrix
+        return selected
 
-    def mutate_vector(self, vector, mutation_rate=None, sigma=0.1):
+    def mutate(self, genomes, mutation_rate=None, sigma=0.1):
         """
-        Apply Gaussian mutation to each element of the bias vector.
+        Apply Gaussian mutation to each element of the genomes.
         """
         if mutation_rate is None:
             mutation_rate = self.config["training"].get("mutation_rate", 0.1)
-        new_vector = np.copy(vector)
-        for i in range(len(new_vector)):
-            if random.random() < mutation_rate:
-                new_vector[i] += np.random.normal(0, sigma)
-        return new_vector
+        return gaussian_mutation(genomes, mutation_rate, sigma)
 
     # -------------------------------
     # NSGA-II Update Routine
     # -------------------------------
 
-    def tournament_selection(self, population_with_fitness, tournament_size=2):
+    def tournament_selection(self, fitness, n_selections, tournament_size=2):
         """
-        Perform tournament selection to choose parents.
+        Perform n_selections tournaments, as a batch, to choose parents.
         
         Parameters:
-          population_with_fitness: List of tuples (individual, fitness)
+          fitness: Objective tuples of the population
+          n_selections: Number of tournaments
           tournament_size: Size of tournament
           
         Returns:
-          Selected individual (weights, biases)
+          Indices of the selected individuals
         """
-        tournament = random.sample(population_with_fitness, tournament_size)
+        dominates = dominance_matrix(fitness)
+        tournaments = sample_distinct(n_selections, len(fitness), tournament_size)
         # Select best individual from tournament (considering Pareto dominance)
-        best = tournament[0]
-        for candidate in tournament[1:]:
-            if self.dominates(candidate[1], best[1]):
-                best = candidate
-        return best[0]
+        best = tournaments[:, 0]
+        for k in range(1, tournaments.shape[1]):
+            candidate = tournaments[:, k]
+            best = np.where(dominates[candidate, best], candidate, best)
+        return best
 
-    def crossover(self, parent1, parent2, crossover_rate=0.8):
+    def crossover(self, parents1, parents2, crossover_rate=0.8):
         """
-        Perform crossover between two parents.
+        Perform crossover between pairs of parents.
         
         Parameters:
-          parent1, parent2: Tuples of (weights, biases)
+          parents1, parents2: Genomes of the parents, one pair per row
           crossover_rate: Probability of performing crossover
           
         Returns:
-          Two offspring as tuples of (weights, biases)
+          Two offspring genomes per pair, as two matrices
         """
-        parent1_weights, parent1_biases = parent1
-        parent2_weights, parent2_biases = parent2
-        
-        if random.random() > crossover_rate:
-            # No crossover, return copies of parents
-            return (
-                ([w.copy() for w in parent1_weights], [b.copy() for b in parent1_biases]),
-                ([w.copy() for w in parent2_weights], [b.copy() for b in parent2_biases])
-            )
-        
-        # Arithmetic crossover
-        alpha = random.random()
+        n_pairs = len(parents1)
+        # Arithmetic crossover, with one alpha per pair; no crossover returns copies of parents
+        alpha = np.random.random((n_pairs, 1))
+        no_crossover = np.random.random((n_pairs, 1)) > crossover_rate
+        alpha1 = np.where(no_crossover, 1.0, alpha)
+        alpha2 = np.where(no_crossover, 0.0, 1 - alpha)
+        return (arithmetic_crossover(parents1, parents2, alpha1), 
+                arithmetic_crossover(parents1, parents2, alpha2))
+
+    def evolve(self, fitness):
+        """
+        Breed offspring from the population: tournament selection, crossover and mutation.
         
-        # Crossover for weights
-        child1_weights = []
-        child2_weights = []
-        for w1, w2 in zip(parent1_weights, parent2_weights):
-            child1_w = alpha * w1 + (1 - alpha) * w2
-            child2_w = (1 - alpha) * w1 + alpha * w2
-            child1_weights.append(child1_w)
-            child2_weights.append(child2_w)
+        Parameters:
+          fitness: A list of objective tuples for the current population.
+          
+        Returns:
+          The offspring genomes, one per row (as many as the population)
+        """
+        pop_size = len(self.population)
         
-        # Crossover for biases
-        child1_biases = []
-        child2_biases = []
-        for b1, b2 in zip(parent1_biases, parent2_biases):
-            child1_b = alpha * b1 + (1 - alpha) * b2
-            child2_b = (1 - alpha) * b1 + alpha * b2
-            child1_biases.append(child1_b)
-            child2_biases.append(child2_b)
+        # Generate offspring using tournament selection and crossover, as a batch of parent pairs
+        n_pairs = (pop_size + 1) // 2
+        parents = self.tournament_selection(fitness, 2 * n_pairs)
+        children1, children2 = self.crossover(self.population[parents[:n_pairs]], 
+                                              self.population[parents[n_pairs:]])
+        offspring = np.empty((2 * n_pairs, self.layout.size))
+        offspring[0::2] = children1
+        offspring[1::2] = children2
         
-        return (child1_weights, child1_biases), (child2_weights, child2_biases)
+        # Trim offspring to exact population size, and apply mutation
+        return self.mutate(offspring[:pop_size])
 
-    def update(self, fitness):
+    def update(self, fitness, offspring, offspring_fitness):
         """
-        Update the population using NSGA-II selection.
+        Update the population using NSGA-II (mu + lambda) selection.
         
         Parameters:
           fitness: A list of objective tuples for the current population.
-                  If None, will evaluate current population.
-          evaluate_offspring: Whether to evaluate offspring fitness (should be True for real runs)
+          offspring: Offspring bred by :meth:`evolve` from fitness.
+          offspring_fitness: The objective tuples of the offspring, evaluated on the simulator 
+                  by the caller (e.g., with a policies.npga.evaluator.ParallelEvaluator).
           
         Returns:
           Updated fitness values for the new population
         """
         pop_size = len(self.population)
         
-        # If no fitness provided, evaluate current population
-        if fitness is None:
-            fitness = []
-            for weights, biases in self.population:
-                individual = Individual(weights, biases, self.obs_type)
-                fit = self.evaluate_individual(individual)
-                fitness.append(fit)
-        
-        # Create offspring population
-        offspring = []
-        
-        # Create population with fitness for tournament selection
-        population_with_fitness = list(zip(self.population, fitness))
-        
-        # Generate offspring using tournament selection and crossover
-        while len(offspring) < pop_size:
-            # Select parents using tournament selection
-            parent1 = self.tournament_selection(population_with_fitness)
-            parent2 = self.tournament_selection(population_with_fitness)
-            
-            # Perform crossover
-            child1, child2 = self.crossover(parent1, parent2)
-            
-            # Apply mutation
-            mutated_child1_weights = [self.mutate_matrix(w) for w in child1[0]]
-            mutated_child1_biases = [self.mutate_vector(b) for b in child1[1]]
-            
-            mutated_child2_weights = [self.mutate_matrix(w) for w in child2[0]]
-            mutated_child2_biases = [self.mutate_vector(b) for b in child2[1]]
-            
-            offspring.append((mutated_child1_weights, mutated_child1_biases))
-            if len(offspring) < pop_size:
-                offspring.append((mutated_child2_weights, mutated_child2_biases))
-        
-        # Trim offspring to exact population size
-        offspring = offspring[:pop_size]
-        
-        # Evaluate offspring fitness
-        offspring_fitness = []
-        if evaluate_offspring:
-            for weights, biases in offspring:
-                individual = Individual(weights, biases, self.obs_type)
-                fit = self.evaluate_individual(individual)
-                offspring_fitness.append(fit)
-        else:
-            # For testing/debugging: simulate offspring fitness
-            for _ in offspring:
-                base_fit = random.choice(fitness)
-                noise = tuple(random.uniform(-0.01, 0.01) for _ in range(len(base_fit)))
-                offspring_fitness.append(tuple(b + n for b, n in zip(base_fit, noise)))
-        
         # Combine current population and offspring
-        combined_population = self.population + offspring
-        combined_fitness = fitness + offspring_fitness
+        combined_population = np.concatenate([self.population, offspring])
+        combined_fitness = [tuple(fit) for fit in fitness] + [tuple(fit) for fit in offspring_fitness]
         
         # Select next generation using NSGA-II selection
-        new_population, new_fitness = self.select_next_generation(
-            combined_population, combined_fitness, pop_size
-        )
+        selected = self.select_survivors(combined_fitness, pop_size)
         
         # Update population
-        self.population = new_population
+        self.population = combined_population[selected]
+        self.fitness = [combined_fitness[idx] for idx in selected]
+        self.survivors = selected
         
-        return new_fitness
\ No newline at end of file
+        return self.fitness
@@ -0,0 +1,67 @@
+import numpy as np
+from typing import List, Sequence, Tuple
+
+
+class GenomeLayout:
+    """
+    Layout of the parameters of a network (weight matrices, then bias vectors) in a flat genome,
+    so that a population is a single (pop_size, size) matrix, one genome per row, on which the
+    genetic operators run as batched numpy operations.
+
+    Attributes:
+        shapes: The shapes of the parameter arrays, in genome order.
+        offsets: The start of each array in the genome, and the genome size last.
+        size: The genome size.
+        segment_ids: The index of the array of each genome element.
+    """
+
+    def __init__(self, shapes: Sequence[Tuple[int, ...]]):
+        self.shapes = [tuple(shape) for shape in shapes]
+        sizes = [int(np.prod(shape)) for shape in self.shapes]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+        self.size = int(self.offsets[-1])
+        self.segment_ids = np.repeat(np.arange(len(sizes)), sizes)
+
+    def flatten(self, arrays: Sequence[np.ndarray]) -> np.ndarray:
+        """Return the genome of the parameter arrays."""
+        return np.concatenate([np.ravel(array) for array in arrays])
+
+    def unflatten(self, genome: np.ndarray) -> List[np.ndarray]:
+        """Return the parameter arrays of a genome, as views of it."""
+        return [genome[start:end].reshape(shape)
+                for start, end, shape in zip(self.offsets[:-1], self.offsets[1:], self.shapes)]
+
+
+def dominance_matrix(fitness) -> np.ndarray:
+    """Return the boolean matrix D where D[p, q] is whether solution p dominates solution q (minimization)."""
+    fitness = np.asarray(fitness, dtype=float)
+    better_or_equal = (fitness[:, None, :] <= fitness[None, :, :]).all(axis=2)
+    strictly_better = (fitness[:, None, :] < fitness[None, :, :]).any(axis=2)
+    return better_or_equal & strictly_better
+
+
+def sample_distinct(n_rows: int, population_size: int, k: int) -> np.ndarray:
+    """Draw n_rows sets of k distinct indices in range(population_size), as a (n_rows, k) matrix."""
+    k = min(k, population_size)
+    if k == 2:
+        first = np.random.randint(population_size, size=n_rows)
+        second = np.random.randint(population_size - 1, size=n_rows)
+        second += second >= first
+        return np.stack([first, second], axis=1)
+    keys = np.random.random((n_rows, population_size))
+    if k == population_size:
+        return np.argsort(keys, axis=1)
+    return np.argpartition(keys, k - 1, axis=1)[:, :k]
+
+
+def arithmetic_crossover(parents1: np.ndarray, parents2: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """Return the children alpha * parents1 + (1 - alpha) * parents2, row by row."""
+    return alpha * parents1 + (1 - alpha) * parents2
+
+
+def gaussian_mutation(genomes: np.ndarray, mutation_rate: float, sigma: float) -> np.ndarray:
+    """Return the genomes with N(0, sigma) noise added to each element with probability mutation_rate."""
+    mutated = genomes.copy()
+    mask = np.random.random(genomes.shape) < mutation_rate
+    mutated[mask] += np.random.normal(0, sigma, int(mask.sum()))
+    return mutated
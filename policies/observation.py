@@ -0,0 +1,133 @@
+import weakref
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.env import Env
+from core.task import Task
+
+__all__ = ["ObservationBuilder"]
+
+
+class ObservationBuilder(object):
+    """Incrementally maintained observations of an environment, shared by the learned policies.
+
+    The builder owns float32 buffers holding the observed features. On each request it
+    copies only the node and link rows that changed since its last refresh, as recorded
+    by the version stamps of the infrastructure state, and returns the buffers themselves.
+    Callers that keep an observation across decisions (e.g., in a replay buffer) must copy it.
+
+    Two layouts are provided:
+        - flat: the node features followed by the link features, in the fixed order
+          cpu, buffer, bw (free bandwidth of each link).
+        - nodes: a (n_nodes, len(obs_type)) matrix with one column per entry of obs_type,
+          paired with the task features (task_size, cycles_per_bit, trans_bit_rate, ddl).
+          In this layout, "bw" is the bottleneck free bandwidth on the shortest path from the
+          task's source node, "bw_from_e0" the free bandwidth of the link from node e0 and
+          "bw_out" the free bandwidth of the (last) link leaving the node.
+    """
+
+    NODE_FEATURES = ("cpu", "buffer")
+    LINK_FEATURES = ("bw", "bw_from_e0", "bw_out")
+    TASK_FEATURES = ("task_size", "cycles_per_bit", "trans_bit_rate", "ddl")
+
+    _builders: "weakref.WeakKeyDictionary[Env, dict]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, env: Env, obs_type: Sequence[str] = ("cpu", "buffer", "bw")):
+        self.env = env
+        self.obs_type = tuple(obs_type)
+        self.state = env.scenario.get_state()
+
+        n_nodes = len(self.state.free_cpu_freq)
+        n_links = len(self.state.free_bandwidth)
+
+        # flat layout, with views on the feature segments
+        sizes = [n_nodes if feature in self.NODE_FEATURES else n_links
+                 for feature in ("cpu", "buffer", "bw") if feature in self.obs_type]
+        self.flat = np.zeros(sum(sizes), dtype=np.float32)
+        self._flat_views = {}
+        start = 0
+        for feature in ("cpu", "buffer", "bw"):
+            if feature in self.obs_type:
+                size = n_nodes if feature in self.NODE_FEATURES else n_links
+                self._flat_views[feature] = self.flat[start:start + size]
+                start += size
+
+        # nodes layout
+        self.nodes = np.zeros((n_nodes, len(self.obs_type)), dtype=np.float32)
+        self.task = np.zeros(len(self.TASK_FEATURES), dtype=np.float32)
+        self._columns = {feature: self.nodes[:, i] for i, feature in enumerate(self.obs_type)}
+
+        self._bw = np.zeros(n_links, dtype=np.float32)
+        self._link_columns = self._build_link_columns()
+
+        self._version = -1
+
+    @classmethod
+    def of(cls, env: Env, obs_type: Sequence[str] = ("cpu", "buffer", "bw")) -> "ObservationBuilder":
+        """Return the builder of the given environment and observation type, creating it if needed."""
+        builders = cls._builders.setdefault(env, {})
+        key = tuple(obs_type)
+        builder = builders.get(key)
+        if builder is None or builder.state is not env.scenario.get_state():
+            builder = builders[key] = cls(env, key)
+        return builder
+
+    def _build_link_columns(self):
+        """Map the "bw_from_e0" and "bw_out" columns to (node rows, link indices)."""
+        scenario = self.env.scenario
+        from_e0, out = {}, {}
+        for link_idx, (src_name, dst_name, _) in enumerate(scenario.get_links()):
+            if src_name == 'e0':
+                from_e0[scenario.node_name2id[dst_name]] = link_idx
+            else:
+                out[scenario.node_name2id[src_name]] = link_idx
+        return {
+            feature: (np.fromiter(mapping.keys(), dtype=np.int64, count=len(mapping)),
+                      np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping)))
+            for feature, mapping in (("bw_from_e0", from_e0), ("bw_out", out))
+        }
+
+    def refresh(self):
+        """Copy the node and link rows that changed since the last refresh."""
+        state = self.state
+        if state.version == self._version:
+            return
+        nodes = np.flatnonzero(state.node_version > self._version)
+        links = np.flatnonzero(state.link_version > self._version)
+
+        for feature, source in (("cpu", state.free_cpu_freq), ("buffer", state.buffer_free_size)):
+            if feature in self.obs_type:
+                self._flat_views[feature][nodes] = source[nodes]
+                self._columns[feature][nodes] = source[nodes]
+        if len(links):
+            self._bw[links] = state.free_bandwidth[links]
+            if "bw" in self._flat_views:
+                self._flat_views["bw"][links] = self._bw[links]
+            for feature, (rows, link_idx) in self._link_columns.items():
+                if feature in self._columns:
+                    self._columns[feature][rows] = self._bw[link_idx]
+
+        self._version = state.version
+
+    def flat_observation(self) -> np.ndarray:
+        """Return the flat observation vector. The buffer is reused by the next call."""
+        self.refresh()
+        return self.flat
+
+    def node_observation(self, task: Optional[Task]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (nodes, task) observation pair. The buffers are reused by the next call."""
+        self.refresh()
+        if task is None:
+            self.task.fill(0)
+        else:
+            self.task[:] = (task.task_size, task.cycles_per_bit, task.trans_bit_rate, task.ddl)
+
+        if "bw" in self._columns:
+            column = self._columns["bw"]
+            if task is None:
+                column.fill(0)
+            else:
+                bottleneck = self.env.scenario.infrastructure.get_bottleneck_bandwidth()
+                column[:] = bottleneck.from_node(self.env.scenario.node_name2id[task.src_name])
+        return self.nodes, self.task
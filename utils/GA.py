@@ -4,7 +4,6 @@ This script demonstrates how to run the NPGAPolicy.
 
 import os
 import sys
-from multiprocessing import Pool, cpu_count
 
 import torch
 
@@ -19,11 +18,14 @@ import yaml
 
 from core.env import Env
 from core.task import Task
+from core.task_table import TaskTable
 from core.vis import *
 from core.vis.vis_stats import VisStats
 from core.vis.logger import Logger
 from eval.benchmarks.Pakistan.scenario import Scenario
 from eval.metrics.metrics import SuccessRate, AvgLatency
+from policies.npga.evaluator import ParallelEvaluator
+from policies.npga.fitness_cache import FitnessCache
 from policies.npga.npga_policy import Individual, NPGAPolicy
 from policies.npga.nsga_policy import NSGA2Policy
 
@@ -33,7 +35,11 @@ import matplotlib.pyplot as plt
 from utils import create_env, get_metrics, update_metrics
 
 def error_handler(error: Exception):
-    """Customized error handler for different types of errors."""
+    """Customized error handler for different types of errors.
+
+    Task failures are recorded by the environment and no longer raised from env.run;
+    this handler is kept for compatibility with environments that still raise them.
+    """
     errors = ['DuplicateTaskIdError', 'NetworkXNoPathError', 'IsolatedWirelessNode', 'NetCongestionError', 'InsufficientBufferError']
     message = error.args[0][0]
     if message in errors:
@@ -42,35 +48,27 @@ def error_handler(error: Exception):
         raise
 
 
-def evaluate_individual(args):
+def evaluate_individual(policy, data, config):
     """
     Evaluate an individual solution.
     """
-    m1 = SuccessRate()
-    m2 = AvgLatency()
-    
-    policy, data, config = args
+    if isinstance(data, pd.DataFrame):
+        data = TaskTable.from_dataframe(data, ddl_divisor=10)
     env = create_env(config)
     
     
     until = 0
     launched_task_cnt = 0
-    iter_data = data.iterrows()
     
-    for i, task_info in iter_data:
-        generated_time = task_info['GenerationTime']
-        task = Task(task_id=task_info['TaskID'],
-                    task_size=task_info['TaskSize'],
-                    cycles_per_bit=task_info['CyclesPerBit'],
-                    trans_bit_rate=task_info['TransBitRate'],
-                    ddl=task_info['DDL'] / 10,
-                    src_name='e0',
-                    task_name=task_info['TaskName'])
+    for task_info in data:
+        generated_time = task_info.generation_time
+        task = task_info.to_task(env.task_pool)
         
         while True:
             # Catch completed task information.
             while env.done_task_info:
                 _ = env.done_task_info.pop(0)
+            env.failed_task_info.clear()
             
             if env.now >= generated_time:
                 dst_id, state = policy.act(env, task)  # offloading decision
@@ -79,7 +77,7 @@ def evaluate_individual(args):
                 launched_task_cnt += 1
                 break
             
-            until += env.refresh_rate
+            until = env.next_until(until, generated_time)
             try:
                 env.run(until=until)
             except Exception as e:
@@ -87,7 +85,7 @@ def evaluate_individual(args):
     
     # Continue simulation until all launched tasks are completed.
     while env.task_count < launched_task_cnt:
-        until += env.refresh_rate
+        until = env.next_until(until)
         try:
             env.run(until=until)
         except Exception as e:
@@ -95,21 +93,38 @@ def evaluate_individual(args):
             
     ttr, latency, energy, score = get_metrics(env, config)
     
-    return ttr, latency, energy, score
+    # The sketches are small and merge across workers, unlike the raw task records
+    return ttr, latency, energy, score, env.streaming_metrics
 
-def run_epoch(config, policy, data: pd.DataFrame, train=True):
-    with Pool(processes=cpu_count()-1) as pool:
-        args = [(ind, data, config) for ind in policy.individuals()]
-        fitness = pool.map(evaluate_individual, args)
-        
-    fitness = np.array(fitness)
+def run_epoch(evaluator: ParallelEvaluator, policy, dataset: str, train=True):
+    """
+    Evaluate the population on a dataset of the evaluator, and evolve it if train is set.
+    
+    When training, the results of the population are those recorded by the previous training 
+    epoch (in policy.results), so that only the offspring are simulated, except at the first 
+    generation. The returned fitness and streaming metrics are those of the population after 
+    the update.
+    """
+    results = None
+    if train and getattr(policy, "results", None) is not None and policy.results[0] == dataset:
+        results = policy.results[1]
+    if results is None:
+        results = evaluator.map(policy.individuals(), dataset)
     
-    pool.close()
-    pool.join()    
     if train:
-        policy.update(fitness[:, :3])
+        offspring = policy.evolve([result[:3] for result in results])
+        offspring_results = evaluator.map(policy.individuals(offspring), dataset)
+        policy.update([result[:3] for result in results], offspring, 
+                      [result[:3] for result in offspring_results])
+        # Results of the new population, selected among the parents and the offspring
+        combined_results = list(results) + list(offspring_results)
+        results = [combined_results[idx] for idx in policy.survivors]
+        policy.results = (dataset, results)
+        
+    fitness = np.array([result[:4] for result in results])
+    streaming_metrics = [result[4] for result in results]
 
-    return fitness
+    return fitness, streaming_metrics
 
 
 
@@ -218,11 +233,19 @@ def main():
     valid_size = config["training"].get("valid_size", 0.2)
     
     # Load train and test datasets.
-    train_data = pd.read_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/trainset.csv")
-    train_data, valid_data = train_data.iloc[:int(len(train_data)*(1-valid_size))], train_data.iloc[int(len(train_data)*(1-valid_size)):]
-    valid_data["GenerationTime"] = valid_data["GenerationTime"] - valid_data["GenerationTime"].min()
+    train_data = TaskTable.from_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/trainset.csv", ddl_divisor=10)
+    train_data, valid_data = train_data[:int(len(train_data)*(1-valid_size))], train_data[int(len(train_data)*(1-valid_size)):]
+    valid_data = valid_data.normalize_time()
     
-    test_data = pd.read_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/testset.csv") 
+    test_data = TaskTable.from_csv(f"eval/benchmarks/{config['env']['dataset']}/data/{config['env']['flag']}/testset.csv", ddl_divisor=10)
+
+    # Individuals surviving unchanged across generations are not simulated again on the same dataset
+    cache = FitnessCache(max_size=config["training"].get("fitness_cache_size", 10000), 
+                         path=config["training"].get("fitness_cache_path"))
+
+    # The workers are started once with the datasets: only the individuals are sent per evaluation
+    evaluator = ParallelEvaluator(evaluate_individual, config, 
+                                  {"train": train_data, "valid": valid_data, "test": test_data}, cache=cache)
 
     if config["policy"] == "NPGA":
         policy = NPGAPolicy(env, config)
@@ -248,18 +271,21 @@ def main():
         
         # Training phase.
         logger.update_mode('Training')
-        tr_fitness = run_epoch(config, policy, train_data, train=True)
-        SR, L, E, score = tr_fitness[np.argmin(np.array(tr_fitness)[:, 3])]
-        update_metrics(logger, env, config, metrics=(SR, L, E, score))
+        tr_fitness, tr_streaming_metrics = run_epoch(evaluator, policy, "train", train=True)
+        best_tr_individual = np.argmin(np.array(tr_fitness)[:, 3])
+        SR, L, E, score = tr_fitness[best_tr_individual]
+        update_metrics(logger, env, config, metrics=(SR, L, E, score), 
+                       streaming_metrics=tr_streaming_metrics[best_tr_individual])
 
         
 
         # Validation phase.
         logger.update_mode('Validation')
-        fitness = run_epoch(config, policy, valid_data, train=False)
+        fitness, streaming_metrics = run_epoch(evaluator, policy, "valid", train=False)
         best_epoch_individual = np.argmin(np.array(fitness)[:, 3])
         SR, L, E, score = fitness[best_epoch_individual]
-        update_metrics(logger, env, config, metrics=(SR, L, E, score))
+        update_metrics(logger, env, config, metrics=(SR, L, E, score), 
+                       streaming_metrics=streaming_metrics[best_epoch_individual])
         env.close()
 
 
@@ -285,9 +311,11 @@ def main():
         
     ## Final evaluation on test data.
     logger.update_mode('Testing')
-    fitness = run_epoch(config, policy, test_data, train=False)
-    SR, L, E, score = fitness[np.argmin(np.array(fitness)[:, 3])]
-    update_metrics(logger, env, config, metrics=(SR, L, E, score))
+    fitness, streaming_metrics = run_epoch(evaluator, policy, "test", train=False)
+    best_test_individual = np.argmin(np.array(fitness)[:, 3])
+    SR, L, E, score = fitness[best_test_individual]
+    update_metrics(logger, env, config, metrics=(SR, L, E, score), 
+                   streaming_metrics=streaming_metrics[best_test_individual])
 
     logger.plot()
     logger.save_csv()
@@ -299,6 +327,7 @@ def main():
     # Plot final Pareto frontiers.
     plot_pareto(fitness, logger.log_dir)
     
+    evaluator.close()
     logger.close()
     env.close()
 
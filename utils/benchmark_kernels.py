@@ -0,0 +1,98 @@
+"""
+Micro-benchmark of the discrete-event kernels.
+
+Runs the same model on simpy and on core.kernel.EventKernel: n_procs concurrent chains of
+timeouts, each with n_events pre-drawn delays, advanced by run(until) calls on a fixed grid as
+the simulation run loops do. Reports the events handled per second by each kernel.
+
+See utils/check_engines.py for the end-to-end comparison of the simulation engines.
+
+Usage:
+    python utils/benchmark_kernels.py [--n_procs 1000] [--n_events 200]
+"""
+
+import os
+import sys
+
+current_file_path = os.path.abspath(__file__)
+current_dir = os.path.dirname(current_file_path)
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import argparse
+import time
+
+import numpy as np
+import simpy
+
+from core.kernel import NORMAL, EventKernel
+
+
+def run_simpy(delays: np.ndarray, step: float) -> list:
+    """Run the chains as simpy processes. Return the end time of each chain."""
+    env = simpy.Environment()
+    ends = [0.0] * len(delays)
+
+    def chain(i, chain_delays):
+        for delay in chain_delays:
+            yield env.timeout(delay)
+        ends[i] = env.now
+
+    for i, chain_delays in enumerate(delays.tolist()):
+        env.process(chain(i, chain_delays))
+    # The stop events of run(until) stay in the queue, so that it never empties: stop on the ends instead
+    until = 0
+    while not all(ends):
+        until += step
+        env.run(until)
+    return ends
+
+
+def run_kernel(delays: np.ndarray, step: float) -> list:
+    """Run the chains as kernel events. Return the end time of each chain."""
+    ends = [0.0] * len(delays)
+    chains = delays.tolist()
+
+    def on_timeout(i, k):
+        k += 1
+        if k < len(chains[i]):
+            kernel.schedule(kernel.now + chains[i][k], NORMAL, 0, i, k)
+        else:
+            ends[i] = kernel.now
+
+    kernel = EventKernel([on_timeout])
+    for i, chain_delays in enumerate(chains):
+        kernel.schedule(chain_delays[0], NORMAL, 0, i, 0)
+    until = 0
+    while len(kernel):
+        until += step
+        kernel.run(until)
+    return ends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the discrete-event kernels.")
+    parser.add_argument("--n_procs", type=int, default=1000, help="Number of concurrent chains of timeouts.")
+    parser.add_argument("--n_events", type=int, default=200, help="Number of timeouts of each chain.")
+    parser.add_argument("--step", type=float, default=1.0, help="Step of the run(until) calls.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs; the best one is reported.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    delays = rng.exponential(1.0, size=(args.n_procs, args.n_events))
+    n_events = delays.size
+
+    print(f"{'kernel':<14}{'events':>10}{'time (s)':>10}{'events/s':>12}")
+    results = {}
+    for name, run in (("simpy", run_simpy), ("EventKernel", run_kernel)):
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[name] = run(delays, args.step)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<14}{n_events:>10}{best:>10.3f}{n_events / best:>12,.0f}")
+    assert results["simpy"] == results["EventKernel"], "The kernels disagree on the end times."
+
+
+if __name__ == "__main__":
+    main()
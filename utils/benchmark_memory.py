@@ -0,0 +1,110 @@
+"""
+Memory benchmark of the in-flight tasks.
+
+Measures the bytes allocated per task held by the simulator, for the slotted Task (with its
+lazily created Data / DataFlow) and for the former __dict__-based layout, which allocated a
+Data and a DataFlow object with every task.
+
+Usage:
+    python utils/benchmark_memory.py --n_tasks 100000
+"""
+
+import os
+import sys
+
+current_file_path = os.path.abspath(__file__)
+current_dir = os.path.dirname(current_file_path)
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import argparse
+import gc
+import tracemalloc
+
+from core.task import Task, TaskPool
+
+
+class _LegacyData(object):
+    def __init__(self, data_size):
+        self.data_size = data_size
+
+
+class _LegacyDataFlow(object):
+    def __init__(self, bit_rate):
+        self.bit_rate = bit_rate
+        self.links = None
+
+
+class _LegacyTask(object):
+    """The __dict__-based layout of the tasks before the slotted classes."""
+    def __init__(self, task_id, task_size, cycles_per_bit, trans_bit_rate, src_name, ddl=-1, task_name=""):
+        self.task_id = task_id
+        self.task_size = task_size
+        self.cycles_per_bit = cycles_per_bit
+        self.trans_bit_rate = trans_bit_rate
+        self.ddl = ddl
+        self.cpu_freq = -1
+        self.task_data = _LegacyData(task_size)
+        self.trans_flow = _LegacyDataFlow(trans_bit_rate)
+        self.trans_time = -1
+        self.wait_time = -1
+        self.exe_time = -1
+        self.exe_energy = -1
+        self.trans_energy = -1
+        self.src_name = src_name
+        self.dst = None
+        self.dst_id = None
+        self.dst_name = None
+        self.task_name = task_name
+        self.exe_cnt = 0
+
+
+def bytes_per_task(make_task, n_tasks: int, transmitted: bool = False) -> float:
+    """Return the bytes allocated per task for n_tasks tasks alive at the same time."""
+    # The task attribute values are shared by all layouts and allocated beforehand
+    args = [(i, 270, 1000.0, 100, 'e0', 30.0, 't') for i in range(n_tasks)]
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    tasks = [make_task(*arg) for arg in args]
+    if transmitted:
+        for task in tasks:
+            task.trans_flow
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return (end - start) / n_tasks
+
+
+def pooled_allocations(n_tasks: int, n_in_flight: int) -> int:
+    """Return the number of Task objects created to run n_tasks tasks, n_in_flight at a time."""
+    pool = TaskPool()
+    created = set()
+    in_flight = []
+    for i in range(n_tasks):
+        task = pool.acquire(i, 270, 1000.0, 100, 'e0', 30.0, 't')
+        created.add(id(task))
+        in_flight.append(task)
+        if len(in_flight) == n_in_flight:
+            pool.release(in_flight.pop(0))
+    return len(created)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory benchmark of the in-flight tasks.")
+    parser.add_argument("--n_tasks", type=int, default=100000, help="Number of tasks alive at the same time.")
+    args = parser.parse_args()
+
+    print(f"{'layout':<28}{'bytes/task':>12}")
+    for name, make_task, transmitted in (("dict (Data + DataFlow)", _LegacyTask, False),
+                                         ("slots", Task, False),
+                                         ("slots, transmitted", Task, True)):
+        print(f"{name:<28}{bytes_per_task(make_task, args.n_tasks, transmitted):>12.1f}")
+
+    n_in_flight = 64
+    print(f"Task objects created for {args.n_tasks} tasks with {n_in_flight} in flight: "
+          f"{args.n_tasks} without pool, {pooled_allocations(args.n_tasks, n_in_flight)} with a TaskPool")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Equivalence checks and timings of the simulation controllers.
+
+Each heuristic policy is run over a task trace with core.env.Env on the simpy controller
+(simpy.Environment) and on the heap-based controller (core.kernel.ProcessKernel):
+    - the task records and the final simulation time of both must be identical to the reference
+      recorded in utils/check_engines_reference.json, at the last commit that changed the
+      simulation results (buffered tasks starting on completion, and the path-based estimate of
+      GreedyPolicy), so that a regression in the steps shared by both controllers is caught;
+    - on longer traces, the task records, the node counters and the final simulation time of
+      both controllers must be identical, and their run times are reported.
+
+The script exits with a non-zero status if any case differs, so that it can be used as a test.
+
+Usage:
+    python utils/check_engines.py [--n_tasks 3000]
+"""
+
+import os
+import sys
+
+current_file_path = os.path.abspath(__file__)
+current_dir = os.path.dirname(current_file_path)
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from core.task_table import TaskTable
+from policies.heuristics.greedy import GreedyPolicy
+from policies.heuristics.random import RandomPolicy
+from policies.heuristics.round_robin import RoundRobinPolicy
+from utils import create_env
+
+DATASETS = [("Pakistan", "Tuple30K", 0.005), ("Topo4MEC", "25N50E", 1),
+            ("Topo4MEC", "MilanCityCenter", 1), ("Topo4MEC", "100N150E", 1)]
+CONTROLLERS = ("simpy", "kernel")
+POLICIES = {"Random": RandomPolicy, "Greedy": GreedyPolicy, "RoundRobin": RoundRobinPolicy}
+REFERENCE_FILE = os.path.join(current_dir, "check_engines_reference.json")
+
+
+def run_trace(config, policy, data: TaskTable):
+    """Run the tasks to completion as the run loops of main.py and utils/GA.py do."""
+    env = create_env(config)
+    until = 0
+    launched_task_cnt = 0
+    for task_info in data:
+        generated_time = task_info.generation_time
+        task = task_info.to_task(env.task_pool)
+        while True:
+            env.done_task_info.clear()
+            env.failed_task_info.clear()
+            if env.now >= generated_time:
+                dst_id, _ = policy.act(env, task)
+                env.process(task=task, dst_name=env.scenario.node_id2name[dst_id])
+                launched_task_cnt += 1
+                break
+            until = env.next_until(until, generated_time)
+            env.run(until=until)
+    while env.task_count < launched_task_cnt:
+        until = env.next_until(until)
+        env.run(until=until)
+    env._track_nodes()
+    return env
+
+
+def run_case(dataset: str, flag: str, refresh_rate: float, controller: str, policy_name: str, data: TaskTable):
+    """Run a policy over a trace with the given controller, from fixed seeds."""
+    config = {"env": {"dataset": dataset, "flag": flag, "refresh_rate": refresh_rate,
+                      "controller": controller}}
+    random.seed(0)
+    np.random.seed(0)
+    return run_trace(config, POLICIES[policy_name](), data)
+
+
+def signature(env) -> dict:
+    """Return the results of a run."""
+    return {
+        'task_info': {task_id: env.logger.task_info[task_id] for task_id in env.logger.task_info},
+        'nodes': {name: (node.energy_consumption, node.total_cpu_freq, node.clock)
+                  for name, node in env.scenario.get_nodes().items()},
+        'now': env.now,
+        'task_count': env.task_count,
+    }
+
+
+def check_reference(failures: list):
+    """Compare the runs of both controllers with the recorded reference."""
+    with open(REFERENCE_FILE) as file:
+        cases = json.load(file)["cases"]
+    print(f"{'reference':<28}{'policy':<12}{'tasks':>7}  " + "  ".join(f"{c:<8}" for c in CONTROLLERS))
+    for case in cases:
+        dataset, flag = case["dataset"], case["flag"]
+        data = TaskTable.from_csv(f"eval/benchmarks/{dataset}/data/{flag}/testset.csv")[:case["n_tasks"]]
+        results = []
+        for controller in CONTROLLERS:
+            env = run_case(dataset, flag, case["refresh_rate"], controller, case["policy"], data)
+            task_info = {str(task_id): [status, list(names), list(times), list(energies)]
+                         for task_id, (status, names, times, energies)
+                         in ((task_id, env.logger.task_info[task_id]) for task_id in env.logger.task_info)}
+            diff = [name for name, value in (("task_info", task_info), ("now", env.now)) if value != case[name]]
+            results.append('OK' if not diff else 'DIFF in ' + str(diff))
+            if diff:
+                failures.append(f"reference {dataset}/{flag} {case['policy']} ({controller})")
+        print(f"{dataset + '/' + flag:<28}{case['policy']:<12}{case['n_tasks']:>7}  "
+              + "  ".join(f"{result:<8}" for result in results))
+
+
+def check_controllers(n_tasks: int, failures: list):
+    """Compare the runs of both controllers on longer traces, and time them."""
+    print(f"{'dataset':<28}{'policy':<12}{'tasks':>7}{'simpy (s)':>11}{'kernel (s)':>12}{'speedup':>9}  result")
+    for dataset, flag, refresh_rate in DATASETS:
+        data = TaskTable.from_csv(f"eval/benchmarks/{dataset}/data/{flag}/testset.csv")[:n_tasks]
+        for policy_name in POLICIES:
+            results, times = {}, {}
+            for controller in CONTROLLERS:
+                start = time.perf_counter()
+                env = run_case(dataset, flag, refresh_rate, controller, policy_name, data)
+                times[controller] = time.perf_counter() - start
+                results[controller] = signature(env)
+            diff = [key for key in results["simpy"] if results["simpy"][key] != results["kernel"][key]]
+            print(f"{dataset + '/' + flag:<28}{policy_name:<12}{len(data):>7}{times['simpy']:>11.3f}"
+                  f"{times['kernel']:>12.3f}{times['simpy'] / times['kernel']:>8.1f}x  "
+                  f"{'OK' if not diff else 'DIFF in ' + str(diff)}")
+            if diff:
+                failures.append(f"{dataset}/{flag} {policy_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalence checks and timings of the simulation controllers.")
+    parser.add_argument("--n_tasks", type=int, default=3000, help="Number of tasks of each timed trace.")
+    args = parser.parse_args()
+
+    failures = []
+    check_reference(failures)
+    print()
+    check_controllers(args.n_tasks, failures)
+
+    if failures:
+        sys.exit(f"{len(failures)} case(s) differ: {', '.join(failures)}")
+    print("All cases identical")
+
+
+if __name__ == "__main__":
+    main()
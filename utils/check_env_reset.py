@@ -0,0 +1,95 @@
+"""
+Check that the reused environments start from the same state as freshly built ones.
+
+For each dataset, an environment is run halfway through a trace (leaving tasks in transmission,
+execution and buffers), then compared with a freshly built environment:
+    - after Env.reset(),
+    - for the next environment of create_env, which reuses the scenario.
+
+Usage:
+    python utils/check_env_reset.py
+"""
+
+import os
+import sys
+
+current_file_path = os.path.abspath(__file__)
+current_dir = os.path.dirname(current_file_path)
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import random
+
+import numpy as np
+
+from core.task_table import TaskTable
+from utils import create_env
+
+DATASETS = [("Pakistan", "Tuple30K"), ("Topo4MEC", "25N50E"), ("Topo4MEC", "MilanCityCenter")]
+
+
+def signature(env) -> dict:
+    """Return the observable state of an environment."""
+    scenario = env.scenario
+    state = scenario.get_state()
+    return {
+        'now': env.now,
+        'task_count': env.task_count,
+        'active_tasks': list(env.active_tasks),
+        'wakeups': list(env.wakeups),
+        'done_task_info': list(env.done_task_info),
+        'failed_task_info': list(env.failed_task_info),
+        'node_ticks': dict(env.node_ticks),
+        'task_info': len(env.logger.task_info),
+        'node_info': dict(env.logger.node_info),
+        'nodes': {name: (node.free_cpu_freq, node.max_cpu_freq, node.task_buffer.free_size,
+                         node.task_buffer.max_size, node.task_buffer.task_ids, node.active_task_ids,
+                         node.energy_consumption, node.total_cpu_freq, node.clock)
+                  for name, node in scenario.get_nodes().items()},
+        'links': {key: (link.free_bandwidth, link.max_bandwidth, len(link.data_flows),
+                        link.base_latency, link.energy_coef, link.dis)
+                  for key, link in scenario.get_links().items()},
+        'state': (state.free_cpu_freq.tolist(), state.buffer_free_size.tolist(),
+                  state.free_bandwidth.tolist()),
+        'paths': (scenario.path_latency.tolist(), scenario.path_hops.tolist(),
+                  scenario.path_energy_coef.tolist()),
+    }
+
+
+def run_halfway(env, data: TaskTable, n_tasks: int = 300):
+    """Launch n_tasks tasks at random nodes and stop before they all complete."""
+    random.seed(0)
+    node_names = list(env.scenario.get_nodes())
+    until = 0
+    for task_info in data[:n_tasks]:
+        while env.now < task_info.generation_time:
+            until = env.next_until(until, task_info.generation_time)
+            env.run(until=until)
+        env.process(task=task_info.to_task(), dst_name=random.choice(node_names))
+    env.run(until=env.now + 0.5)
+
+
+def main():
+    for dataset, flag in DATASETS:
+        config = {"env": {"dataset": dataset, "flag": flag}}
+        fresh = signature(create_env({"env": dict(config["env"], reuse_scenario=False)}))
+        data = TaskTable.from_csv(f"eval/benchmarks/{dataset}/data/{flag}/testset.csv")
+
+        env = create_env(config)
+        run_halfway(env, data)
+        dirty = signature(env)
+        env.reset()
+        reset = signature(env)
+
+        run_halfway(env, data)
+        reused = signature(create_env(config))
+
+        assert dirty != fresh, "The run did not change the environment."
+        for name, sig in (("Env.reset", reset), ("create_env (reused scenario)", reused)):
+            diff = [key for key in fresh if fresh[key] != sig[key]]
+            status = "OK" if not diff else f"DIFF in {diff}"
+            print(f"{dataset}/{flag} {name}: {status}")
+
+
+if __name__ == "__main__":
+    main()
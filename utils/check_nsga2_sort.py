@@ -0,0 +1,120 @@
+"""
+Equivalence checks and timings of the vectorised NSGA-II sorting.
+
+Compares NSGA2Policy.non_dominated_sort and NSGA2Policy.crowding_distance with the reference
+pure-Python implementations they replaced, on random fitness sets with ties and duplicates:
+the fronts (including the order within each front) and the distances must be identical.
+
+Usage:
+    python utils/check_nsga2_sort.py [--trials 200]
+"""
+
+import os
+import sys
+
+current_file_path = os.path.abspath(__file__)
+current_dir = os.path.dirname(current_file_path)
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import argparse
+import time
+
+import numpy as np
+
+from policies.npga.nsga_policy import NSGA2Policy
+
+
+def _dominates(obj1, obj2):
+    better_or_equal = all(a <= b for a, b in zip(obj1, obj2))
+    strictly_better = any(a < b for a, b in zip(obj1, obj2))
+    return better_or_equal and strictly_better
+
+
+def reference_crowding_distance(fitness_list):
+    """The former NSGA2Policy.crowding_distance."""
+    num_individuals = len(fitness_list)
+    if num_individuals == 0:
+        return []
+    distances = [0.0] * num_individuals
+    num_objectives = len(fitness_list[0])
+    for m in range(num_objectives):
+        values = [fit[m] for fit in fitness_list]
+        sorted_indices = sorted(range(num_individuals), key=lambda i: values[i])
+        distances[sorted_indices[0]] = float('inf')
+        distances[sorted_indices[-1]] = float('inf')
+        for i in range(1, num_individuals - 1):
+            if max(values) - min(values) == 0:
+                diff = 0
+            else:
+                diff = (values[sorted_indices[i+1]] - values[sorted_indices[i-1]]) / (max(values) - min(values))
+            distances[sorted_indices[i]] += diff
+    return distances
+
+
+def reference_non_dominated_sort(fitness):
+    """The former NSGA2Policy.non_dominated_sort."""
+    population_size = len(fitness)
+    S = [[] for _ in range(population_size)]
+    n = [0] * population_size
+    fronts = [[]]
+    for p in range(population_size):
+        for q in range(population_size):
+            if _dominates(fitness[p], fitness[q]):
+                S[p].append(q)
+            elif _dominates(fitness[q], fitness[p]):
+                n[p] += 1
+        if n[p] == 0:
+            fronts[0].append(p)
+    i = 0
+    while fronts[i]:
+        next_front = []
+        for p in fronts[i]:
+            for q in S[p]:
+                n[q] -= 1
+                if n[q] == 0:
+                    next_front.append(q)
+        i += 1
+        fronts.append(next_front)
+    fronts.pop()
+    return fronts
+
+
+def random_fitness(rng, size: int) -> list:
+    """Random 3-objective fitness tuples, rounded so that ties and duplicates occur."""
+    decimals = rng.integers(0, 3)
+    return [tuple(float(v) for v in row) for row in np.round(rng.random((size, 3)) * 10, decimals)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalence checks and timings of the vectorised NSGA-II sorting.")
+    parser.add_argument("--trials", type=int, default=200, help="Number of random fitness sets.")
+    args = parser.parse_args()
+
+    policy = NSGA2Policy.__new__(NSGA2Policy)  # The sorting does not depend on the environment
+    rng = np.random.default_rng(0)
+    for trial in range(args.trials):
+        fitness = random_fitness(rng, int(rng.integers(0, 120)))
+        fronts = policy.non_dominated_sort(fitness)
+        assert fronts == reference_non_dominated_sort(fitness), f"Fronts differ on trial {trial}."
+        for front in fronts:
+            front_fitness = [fitness[idx] for idx in front]
+            assert policy.crowding_distance(front_fitness) == reference_crowding_distance(front_fitness), \
+                f"Crowding distances differ on trial {trial}."
+    print(f"{args.trials} random fitness sets: identical fronts and crowding distances")
+
+    print(f"{'size':>6}{'reference (s)':>15}{'vectorised (s)':>16}")
+    for size in (100, 500, 1000):
+        fitness = random_fitness(rng, size)
+        timings = []
+        for sort, crowding_distance in ((reference_non_dominated_sort, reference_crowding_distance),
+                                        (policy.non_dominated_sort, policy.crowding_distance)):
+            start = time.perf_counter()
+            for front in sort(fitness):
+                crowding_distance([fitness[idx] for idx in front])
+            timings.append(time.perf_counter() - start)
+        print(f"{size:>6}{timings[0]:>15.3f}{timings[1]:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 from core.env import Env as BaseEnv
 from core.vis.logger import Logger as BaseLogger
 from core.base_scenario import BaseScenario
+from core.task import TaskPool
 import random
 import torch
 from eval.metrics.metrics import SuccessRate, AvgLatency
+from eval.metrics.streaming import StreamingMetrics
 
 import os
 import numpy as np
@@ -45,14 +47,48 @@ class Checkpoint:
         policy.load(os.path.join(self.path, f"checkpoint_epoch_{epoch}.pt"))
 
 
+# Finished tasks are recycled across the environments (and epochs) of a process
+TASK_POOL = TaskPool()
+
+# Scenarios built by create_env, keyed by (dataset, flag)
+_SCENARIOS = {}
+
+
+def get_scenario(dataset, flag, reuse=True):
+    """
+    Return the scenario of a dataset.
+
+    Parsing the config.json, building the graph and precomputing the routing tables and path 
+    matrices is done once per process if reuse is set: the next environments reset the same 
+    scenario to its initial state, so that only the latest environment of a dataset is valid.
+    """
+    scenario = _SCENARIOS.get((dataset, flag)) if reuse else None
+    if scenario is None:
+        scenario = Scenario(config_file=f"eval/benchmarks/{dataset}/data/{flag}/config.json", 
+                            dataset=dataset, flag=flag)
+        if reuse:
+            _SCENARIOS[(dataset, flag)] = scenario
+    return scenario
+
 
 def create_env(config):
-    """Create and return an environment instance."""
+    """Create and return an environment instance, in its initial state."""
     dataset = config["env"]["dataset"]
     flag = config["env"]["flag"]
-    scenario = Scenario(config_file=f"eval/benchmarks/{dataset}/data/{flag}/config.json", 
-                        dataset=dataset, flag=flag)
-    env = Env(scenario, config_file="core/configs/env_config_null.json", verbose=False, refresh_rate=config["env"].get("refresh_rate", 1))
+    scenario = get_scenario(dataset, flag, reuse=config["env"].get("reuse_scenario", True))
+    # The task processes run on the selected controller: "simpy" (simpy.Environment) or 
+    # "kernel" (core.kernel.ProcessKernel), with the same results
+    env = Env(scenario, config_file="core/configs/env_config_null.json", verbose=False, 
+              refresh_rate=config["env"].get("refresh_rate", 1), 
+              event_driven=config["env"].get("event_driven", True), 
+              log_level=config["env"].get("log_level", "INFO"), 
+              log_file=config["env"].get("log_file"), 
+              task_pool=TASK_POOL if config["env"].get("reuse_tasks", True) else None, 
+              controller=config["env"].get("controller", "simpy"))
+
+    # Latency and energy percentiles, updated on task completion
+    env.streaming_metrics = StreamingMetrics()
+    env.logger.task_info.subscribe(env.streaming_metrics)
 
     if "eval" in config and "expected_max_latency" in config["eval"]:
         env.max_total_time = config["eval"]["expected_max_latency"]
@@ -60,8 +96,13 @@ def create_env(config):
         env.max_total_energy = config["eval"]["expected_max_energy"]
     return env
 
+
 def error_handler(error: Exception):
-    """Customized error handler for different types of errors."""
+    """Customized error handler for different types of errors.
+
+    Task failures are recorded by the environment and no longer raised from env.run;
+    this handler is kept for compatibility with environments that still raise them.
+    """
     errors = ['DuplicateTaskIdError', 'NetworkXNoPathError', 'IsolatedWirelessNode', 'NetCongestionError', 'InsufficientBufferError']
     message = error.args[0][0]
     if message in errors:
@@ -94,12 +135,15 @@ class Env(BaseEnv):
     """
     Custom environment class that extends the BaseEnv to include additional functionalities.
     """
-    def __init__(self, scenario, config_file=None, verbose=True, refresh_rate=1):
-        super().__init__(scenario, config_file=config_file, verbose=verbose)
+    def __init__(self, scenario, config_file=None, verbose=True, refresh_rate=1, event_driven=False, 
+                 log_level="INFO", log_file=None, task_pool=None, controller="simpy"):
+        super().__init__(scenario, config_file=config_file, verbose=verbose, event_driven=event_driven, 
+                         log_level=log_level, log_file=log_file, task_pool=task_pool, controller=controller)
         self.max_total_time = 0
         self.max_total_energy = 0
         self.refresh_rate = refresh_rate
-        
+
+
 def set_seed(seed):
     """Set the random seed for reproducibility across all libraries."""
     # Set Python's random module seed
@@ -148,16 +192,28 @@ def get_metrics(env: Env, config: dict):
 
         return ttr, avg_latency, avg_power, None
 
-def update_metrics(logger: Logger, env: Env, config: dict, metrics=None):
+def update_metrics(logger: Logger, env: Env, config: dict, metrics=None, streaming_metrics=None):
+    """
+    Log the metrics of an epoch.
+
+    :param metrics: The (ttr, avg_latency, avg_power, score) tuple, computed from env if None.
+    :param streaming_metrics: The StreamingMetrics whose percentiles are logged, 
+        taken from env if None (e.g., merged from parallel workers otherwise).
+    """
 
     if metrics is None:
         ttr, avg_latency, avg_power, score = get_metrics(env, config)
     else:
         ttr, avg_latency, avg_power, score = metrics
+    if streaming_metrics is None:
+        streaming_metrics = getattr(env, "streaming_metrics", None)
 
     logger.update_metric('TaskThrowRate', ttr *100)
     logger.update_metric('AvgLatency', avg_latency/(1-ttr) if ttr < 1 else np.inf)  # Avoid division by zero
     logger.update_metric("AvgPower", avg_power/(1-ttr) * 1000 if ttr < 1 else np.inf)  # Convert to mW
+    if streaming_metrics is not None and streaming_metrics.energy.count > 0:
+        logger.update_metric('Latency', streaming_metrics.quantiles(streaming_metrics.latency))
+        logger.update_metric('Energy', streaming_metrics.quantiles(streaming_metrics.energy))
     
     
     return ttr, avg_latency, avg_power, score